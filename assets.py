@@ -0,0 +1,62 @@
+"""Per process registry of expensive, session independent assets
+
+Bokeh serve executes an app's main.py afresh for every session but
+imported modules are shared by the whole process, so values stored
+here are computed once and handed to every later session
+
+>>> rgba = assets.get(("pixels", N, M), lambda: pixels(N, M))
+
+NumPy arrays inside an asset are made read-only since all sessions
+see the same buffers
+"""
+import time
+import threading
+import numpy as np
+
+
+LOCK = threading.Lock()
+ITEMS = {}
+STATS = {}
+
+
+def get(key, build):
+    """Value stored under key, calling build() the first time
+
+    :param key: hashable name of the asset, include any parameters
+    :param build: function of no arguments returning the asset
+    """
+    with LOCK:
+        if key not in ITEMS:
+            start = time.perf_counter()
+            ITEMS[key] = read_only(build())
+            STATS[key] = {
+                "hits": 0,
+                "seconds": time.perf_counter() - start}
+        else:
+            STATS[key]["hits"] += 1
+        return ITEMS[key]
+
+
+def stats():
+    """Hits and build time in seconds of every asset"""
+    with LOCK:
+        return {key: dict(value) for key, value in STATS.items()}
+
+
+def clear():
+    with LOCK:
+        ITEMS.clear()
+        STATS.clear()
+
+
+def read_only(value):
+    """Mark arrays inside lists, tuples and dicts as read-only"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            read_only(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            read_only(item)
+    return value
@@ -1,35 +1,24 @@
-import time
+import os
+import sys
 import bokeh.models
 import bokeh.layouts
 import bokeh.plotting
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "chronometer"))
+import rx
 
 
-class Bucket(object):
-    def __init__(self):
-        self.items = []
-
-    def accumulate(self, item):
-        self.items.append(item)
-
-    def summary(self):
-        return len(self.items)
-
-    def reset(self):
-        self.items = []
-
-
-bucket = Bucket()
 p = bokeh.models.Paragraph(text="No clicks")
+document = bokeh.plotting.curdoc()
+clicks = rx.Stream()
+clicks.buffer_time(1000, document).subscribe(
+    lambda events: setattr(p, "text", "{} click(s)".format(len(events))))
 
 
 def on_click_event():
-    bucket.accumulate("event")
+    clicks.emit("event")
 
 
-def on_click_reset():
-    p.text = "{} click(s)".format(bucket.summary())
-    bucket.reset()
-
 buttons = [
     bokeh.models.Button(),
 ]
@@ -39,8 +28,6 @@ on_clicks = [
 for button, on_click in zip(buttons, on_clicks):
     button.on_click(on_click)
 
-document = bokeh.plotting.curdoc()
-document.add_periodic_callback(on_click_reset, 1000)
 document.add_root(bokeh.layouts.column(
     p,
     *buttons))
@@ -0,0 +1,6 @@
+"""Pre-warm matplotlib.pyplot and matplotlib.quiver per server process"""
+
+
+def on_server_loaded(server_context):
+    import matplotlib.pyplot  # noqa: F401
+    import matplotlib.quiver  # noqa: F401
@@ -0,0 +1,75 @@
+"""Emissions per second through typical rx chains
+
+Usage: python benchmark.py
+"""
+import timeit
+import rx
+
+
+NUMBER = 20000
+
+
+def chain_map():
+    source = rx.Stream()
+    source.map(lambda x: x + 1).map(lambda x: 2 * x).subscribe(
+        lambda x: None)
+    return source.emit
+
+
+def chain_filter_scan():
+    source = rx.Stream()
+    source.filter(lambda x: x % 2 == 0).scan(0, lambda a, i: a + i).subscribe(
+        lambda x: None)
+    return source.emit
+
+
+def chain_combine_latest():
+    x, y = rx.Stream(), rx.Stream()
+    rx.combine_latest(x, y).filter(all).map(sum).subscribe(lambda x: None)
+
+    def emit(value):
+        x.emit(value)
+        y.emit(value)
+    return emit
+
+
+def chain_scan_reset():
+    clicks, resets = rx.Stream(), rx.Stream()
+    rx.scan_reset_emit_seed(clicks, lambda a, i: a + i,
+                            reset=resets).subscribe(lambda x: None)
+    resets.emit(0)
+    return clicks.emit
+
+
+def chain_fan_out(n=10):
+    source = rx.Stream()
+    for _ in range(n):
+        source.map(lambda x: x).subscribe(lambda x: None)
+    return source.emit
+
+
+CHAINS = [
+    ("map.map", chain_map),
+    ("filter.scan", chain_filter_scan),
+    ("combine_latest.filter.map", chain_combine_latest),
+    ("scan_reset", chain_scan_reset),
+    ("fan out x10", chain_fan_out),
+]
+
+
+def best_of(emit, number=NUMBER, repeat=5):
+    def run():
+        for i in range(1, number + 1):
+            emit(i)
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def benchmark():
+    print("{:<28} {:>14}".format("chain", "emits/s"))
+    for name, chain in CHAINS:
+        seconds = best_of(chain())
+        print("{:<28} {:>14,.0f}".format(name, NUMBER / seconds))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -4,11 +4,14 @@ Chronometer
 ===========
 
 Navigation tools to explore forecast and time dimensions. Valid and
-start times can be specified by datetime objects while the offsets
+start times are stored as ``datetime64[ms]`` arrays while the offsets
 are represented as ints, specifically hours since forecast
 initialisation time
 
 """
+import weakref
+import datetime as dt
+from collections import OrderedDict
 import numpy as np
 import bokeh.plotting
 import bokeh.models
@@ -23,7 +26,8 @@ def chronometer(
         radio_group=None,
         plus_button=None,
         minus_button=None,
-        selectors=None):
+        selectors=None,
+        document=None):
     """
     Time/forecast exploration widget
 
@@ -51,12 +55,22 @@ def chronometer(
 
     >>> import datetime as dt
     >>> source.stream({
-    ...     "valid": [dt.datetime(2018, 1, 1, 12)],
-    ...     "start": [dt.datetime(2018, 1, 1, 0)],
+    ...     "valid": datetimes([dt.datetime(2018, 1, 1, 12)]),
+    ...     "start": datetimes([dt.datetime(2018, 1, 1, 0)]),
     ...     "offset": [12]
     ... })
     >>> source.selected.indices = [0]
 
+    Valid and start columns are best kept as ``datetime64[ms]``
+    arrays, see :func:`datetimes`, highlighted rows are taken from
+    source with the same dtype so columns stay native arrays and
+    travel to the browser in binary form. Streamed rows should use
+    the same dtype as the columns they extend
+
+    Streamed rows only cost work proportional to their number,
+    the y-axis ticks and highlighted points are extended rather
+    than recomputed
+
     **Selectors**
 
     The radio group allows the user to choose between
@@ -82,6 +96,8 @@ def chronometer(
     :param start: key in source
     :param offset: key in source
     :param source: ColumnDataSource
+    :param document: bokeh Document, if given selection and radio
+                     group changes within one tick render once
 
     :returns: figure, radio group, plus button and
               minus button bokeh widgets
@@ -139,9 +155,18 @@ def chronometer(
     figure.xaxis.axis_label_text_font_size = "10px"
     figure.yaxis.axis_label = "Forecast length"
     figure.yaxis.axis_label_text_font_size = "10px"
-    offsets = source.data[offset][:]
-    if len(offsets) > 0:
-        figure.yaxis.ticker = ticks(max(offsets))
+    max_hour = None
+
+    def update_ticks(values):
+        nonlocal max_hour
+        if len(values) == 0:
+            return
+        hour = max(hours(value) for value in values)
+        if (max_hour is None) or (hour > max_hour):
+            max_hour = hour
+            figure.yaxis.ticker = ticks(max_hour)
+
+    update_ticks(column(source.data[offset]))
     renderer = figure.square(
             x=valid,
             y=offset,
@@ -153,9 +178,7 @@ def chronometer(
     tap_tool.renderers = [renderer]
 
     second_source = bokeh.models.ColumnDataSource({
-        valid: [],
-        offset: [],
-        start: []})
+        k: take(v, []) for k, v in source.data.items()})
     renderer = figure.square(
             x=valid,
             y=offset,
@@ -171,10 +194,10 @@ def chronometer(
             line_color="Black")
 
     selected = rx.Stream()
-    source.selected.on_change('indices', rx.callback(selected))
+    source.selected.on_change('indices', rx.callback(selected, document))
 
     active = rx.Stream()
-    radio_group.on_change("active", rx.callback(active))
+    radio_group.on_change("active", rx.callback(active, document))
     changes = rx.combine_latest(
             active.map(lambda i: selectors[i]),
             selected).filter(all_not_none)
@@ -185,18 +208,46 @@ def chronometer(
             selector, indices = event
             if len(indices) == 0:
                 indices = []
-                data = {k: [] for k in source.data.keys()}
+                data = {k: take(v, []) for k, v in source.data.items()}
             else:
                 index = indices[0]
                 pts = selector(source, index)
-                indices = [pts[0].tolist().index(index)]
-                data = {k: np.asarray(v)[pts] for k, v in source.data.items()}
+                indices = [int(np.searchsorted(pts[0], index))]
+                data = {k: take(v, pts[0]) for k, v in source.data.items()}
             second_source.data = data
             second_source.selected.indices = indices
         return wrapper
 
     changes.map(render(source, second_source))
 
+    latest = None
+
+    def remember(event):
+        nonlocal latest
+        latest = event
+
+    changes.subscribe(remember)
+
+    def on_append(data, start):
+        """Extend ticks and highlighted points by streamed rows only"""
+        update_ticks(column(data[offset], start))
+        if latest is None:
+            return
+        selector, indices = latest
+        if len(indices) == 0:
+            return
+        pts = selector(source, indices[0])[0]
+        rows = pts[np.searchsorted(pts, start):]
+        if len(rows) > 0:
+            second_source.stream({k: take(v, rows) for k, v in data.items()})
+
+    def on_reset(data):
+        nonlocal max_hour
+        max_hour = None
+        update_ticks(column(data[offset]))
+
+    watch(source).subscribe(on_append, on_reset)
+
     plus = rx.Stream()
     plus_button.on_click(rx.click(plus))
     plus = plus.map(+1)
@@ -221,6 +272,21 @@ def all_not_none(items):
     return all(item is not None for item in items)
 
 
+def datetimes(values):
+    """Convert datetimes or milliseconds since epoch to datetime64[ms]"""
+    values = np.asarray(values)
+    if values.dtype.kind in "fiu":
+        values = values.astype(np.int64)
+    return values.astype("datetime64[ms]")
+
+
+def hours(offset):
+    """Forecast length in hours given a number or timedelta"""
+    if isinstance(offset, dt.timedelta):
+        return offset.total_seconds() / 3600
+    return offset
+
+
 def ticks(max_hour):
     """Choose appropriate tick locations for forecasts"""
     step_size = 3
@@ -240,14 +306,12 @@ def sync(large, small, valid="x", offset="y"):
             return
         si = small.selected.indices[0]
         li = large.selected.indices[0]
-        sx = np.asarray(small.data[valid][:])
-        sy = np.asarray(small.data[offset][:])
-        lx = np.asarray(large.data[valid][:])
-        ly = np.asarray(large.data[offset][:])
-        if ((lx[li] == sx[si]) and (ly[li] == sy[si])):
+        key = (value(small.data[valid], si), value(small.data[offset], si))
+        if key == (value(large.data[valid], li),
+                   value(large.data[offset], li)):
             return
-        pts = np.where((lx == sx[si]) & (ly == sy[si]))
-        large.selected.indices = pts[0].tolist()
+        rows = indexed(large, (valid, offset)).find(key)
+        large.selected.indices = list(rows)
     return wrapper
 
 
@@ -263,8 +327,194 @@ def move(source):
 
 
 def select(key):
-    """Select all values in source that match 'key' at index"""
+    """Select all values in source that match 'key' at index
+
+    Selections are memoized by (columns, group value, source version)
+    so navigating inside a group costs a dictionary lookup, the
+    returned rows are read-only since they are shared
+    """
     def wrapper(source, index):
-        values = np.asarray(source.data[key])
-        return np.where(values == values[index])
+        watcher = watch(source)
+        rows = indexed(source, key)
+        memo = (rows.columns, rows.keys[index], watcher.version)
+        result = watcher.selections.get(memo)
+        if result is None:
+            result = np.asarray(rows.group(index))
+            result.flags.writeable = False
+            watcher.selections.set(memo, result)
+        return (result,)
     return wrapper
+
+
+def take(values, rows):
+    """Items of a column at rows without converting the whole column"""
+    if isinstance(values, np.ndarray):
+        return values[rows]
+    return [values[i] for i in rows]
+
+
+def value(values, row):
+    """Item of a column as a plain Python object"""
+    if isinstance(values, np.ndarray):
+        return values[row:row + 1].tolist()[0]
+    return values[row]
+
+
+def column(values, start=0):
+    if isinstance(values, np.ndarray):
+        return values[start:].tolist()
+    return values[start:]
+
+
+WATCHERS = weakref.WeakKeyDictionary()
+
+
+def watch(source):
+    """Watcher shared by every index and subscriber of a source"""
+    if source not in WATCHERS:
+        watcher = Watcher(source.data)
+        source.on_change("data", watcher.on_change)
+        WATCHERS[source] = watcher
+    return WATCHERS[source]
+
+
+def indexed(source, columns):
+    """Index of source grouped by columns, built on first use
+
+    The index is shared by all selectors of a source and follows
+    later changes to ``source.data``
+
+    :param source: ColumnDataSource
+    :param columns: key in source or tuple of keys
+    :returns: Index
+    """
+    if isinstance(columns, str):
+        columns = (columns,)
+    indexes = watch(source).indexes
+    if columns not in indexes:
+        indexes[columns] = Index(source.data, columns)
+    return indexes[columns]
+
+
+def length(data):
+    for values in data.values():
+        return len(values)
+    return 0
+
+
+class Watcher(object):
+    """Tells streamed rows apart from other changes to source.data
+
+    Bokeh does not pass stream or patch details to Python callbacks,
+    so a change is treated as a stream when ``source.data`` is still
+    the same object, the number of rows grows and the first and last
+    known rows are unchanged, anything else is a reset. Assigning
+    ``source.data`` always creates a new object, ``stream()`` and
+    ``patch()`` modify it in place. Indexes are updated before other
+    subscribers so selectors called by subscribers see the new rows
+
+    Every change bumps version, memoized selections of older
+    versions are never returned and age out of the LRU
+
+    :param data: current ``source.data``
+    """
+    def __init__(self, data):
+        self.indexes = {}
+        self.subscribers = []
+        self.version = 0
+        self.selections = LRU()
+        self.remember(data)
+
+    def subscribe(self, on_append, on_reset):
+        """Call on_append(data, start) for streams, on_reset(data) otherwise"""
+        self.subscribers.append((on_append, on_reset))
+
+    def remember(self, data):
+        self.data = data
+        self.n = length(data)
+        if self.n > 0:
+            self.first = self.row(data, 0)
+            self.last = self.row(data, self.n - 1)
+
+    @staticmethod
+    def row(data, i):
+        return tuple(value(data[k], i) for k in sorted(data.keys()))
+
+    def streamed(self, data):
+        n = self.n
+        return (data is self.data) and (n > 0) and (length(data) > n) and (
+                self.row(data, 0) == self.first) and (
+                self.row(data, n - 1) == self.last)
+
+    def on_change(self, attr, old, new):
+        start = self.n
+        self.version += 1
+        if self.streamed(new):
+            for index in self.indexes.values():
+                index.extend(new)
+            for on_append, _ in self.subscribers:
+                on_append(new, start)
+        else:
+            for index in self.indexes.values():
+                index.rebuild(new)
+            for _, on_reset in self.subscribers:
+                on_reset(new)
+        self.remember(new)
+
+
+class Index(object):
+    """Rows of a data dict grouped by the values in some columns
+
+    Grouping is done once, after which the rows sharing a value
+    with a row are a dictionary lookup. Streamed rows are added to
+    the existing groups in O(new rows), see Watcher
+
+    :param data: dict of columns, e.g. ``source.data``
+    :param columns: tuple of keys in data
+    """
+    def __init__(self, data, columns):
+        self.columns = tuple(columns)
+        self.rebuild(data)
+
+    def rebuild(self, data):
+        self.groups = {}
+        self.keys = []
+        self.extend(data)
+
+    def extend(self, data):
+        """Index rows of data beyond those already indexed"""
+        start = len(self.keys)
+        values = [column(data[c], start) for c in self.columns]
+        for row, key in enumerate(zip(*values), start):
+            self.groups.setdefault(key, []).append(row)
+            self.keys.append(key)
+
+    def group(self, row):
+        """Rows sharing values with row in ascending order"""
+        return self.groups[self.keys[row]]
+
+    def find(self, key):
+        """Rows whose values equal key, a tuple with one item per column"""
+        return self.groups.get(tuple(key), [])
+
+
+class LRU(object):
+    """Mapping bounded to maxsize items, least recently used go first"""
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def set(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
@@ -1,4 +1,5 @@
 import datetime as dt
+import numpy as np
 import bokeh.plotting
 import bokeh.models
 import bokeh.events
@@ -12,26 +13,27 @@ import chronometer
 def main():
     document = bokeh.plotting.curdoc()
     source = bokeh.models.ColumnDataSource({
-        "valid": [
+        "valid": chronometer.datetimes([
             dt.datetime(2018, 1, 1, 12),
             dt.datetime(2018, 1, 2, 0),
             dt.datetime(2018, 1, 2, 6),
             dt.datetime(2018, 1, 2, 12),
             dt.datetime(2018, 1, 3, 0),
-            ],
-        "offset": [12, 0, 6, 12, 0],
-        "start": [
+            ]),
+        "offset": np.array([12, 0, 6, 12, 0]),
+        "start": chronometer.datetimes([
             dt.datetime(2018, 1, 1),
             dt.datetime(2018, 1, 2),
             dt.datetime(2018, 1, 2),
             dt.datetime(2018, 1, 2),
-            dt.datetime(2018, 1, 3)]
+            dt.datetime(2018, 1, 3)])
         })
     widgets = chronometer.chronometer(
             valid="valid",
             offset="offset",
             start="start",
-            source=source)
+            source=source,
+            document=document)
     figure, radio_group, plus_button, minus_button = widgets
     layout = bokeh.layouts.layout([
         [radio_group, plus_button, minus_button],
@@ -52,15 +54,10 @@ def main():
             start="z"):
         def wrapper(new):
             i = new[0]
-            x, y, z = (
-                    source.data[valid][i],
-                    source.data[offset][i],
-                    source.data[start][i])
-            if not isinstance(x, dt.datetime):
-                x = dt.datetime.fromtimestamp(x / 1000.)
-            if not isinstance(z, dt.datetime):
-                z = dt.datetime.fromtimestamp(z / 1000.)
-            return x, y, z
+            return (
+                chronometer.value(source.data[valid], i),
+                chronometer.value(source.data[offset], i),
+                chronometer.value(source.data[start], i))
         return wrapper
 
     stream = rx.Stream()
@@ -1,49 +1,484 @@
+import time
+import heapq
+import weakref
+import threading
+import itertools
+import contextlib
 from functools import partial
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 
-def callback(stream):
+BATCH = None
+PROFILER = None
+TICKS = weakref.WeakKeyDictionary()
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+
+def callback(stream, document=None):
+    """Bokeh on_change callback that emits new values to stream
+
+    Each value is emitted inside a batch, with a document the values
+    arriving during one tick are coalesced and only the latest value
+    of each stream is emitted from a next tick callback
+
+    :param document: bokeh Document used to coalesce per tick
+    """
     def wrapper(attr, old, new):
-        stream.emit(new)
+        if document is None:
+            with batch():
+                stream.emit(new)
+        else:
+            tick(document).emit(stream, new)
     return wrapper
 
 
 def click(stream):
     def wrapper():
-        stream.emit()
+        with batch():
+            stream.emit()
     return wrapper
 
 
-class Observable(object):
-    def __init__(self, on_value):
-        self.on_value = on_value
+@contextlib.contextmanager
+def batch():
+    """Coalesce CombineLatest emissions until the outermost batch ends
 
-    def notify(self, value):
-        self.on_value(value)
+    >>> with rx.batch():
+    ...     x.emit(1)
+    ...     y.emit(2)
+
+    Deferred streams are flushed in order of their depth in the
+    graph so each one emits once with its final combined state
+    """
+    global BATCH
+    if BATCH is not None:
+        yield BATCH
+        return
+    BATCH = Batch()
+    try:
+        yield BATCH
+        BATCH.flush()
+    finally:
+        BATCH = None
+
+
+class Batch(object):
+    """Streams waiting to emit at the end of a batch"""
+    __slots__ = ("queue", "queued", "counter")
+
+    def __init__(self):
+        self.queue = []
+        self.queued = set()
+        self.counter = itertools.count()
+
+    def defer(self, stream):
+        if id(stream) in self.queued:
+            return
+        self.queued.add(id(stream))
+        heapq.heappush(self.queue, (stream.rank, next(self.counter), stream))
+
+    def flush(self):
+        while len(self.queue) > 0:
+            _, _, stream = heapq.heappop(self.queue)
+            self.queued.discard(id(stream))
+            stream.flush()
+
+
+def tick(document):
+    """Per document Tick shared by all callbacks"""
+    if document not in TICKS:
+        TICKS[document] = Tick(document)
+    return TICKS[document]
+
+
+class Tick(object):
+    """Emit the latest value of each stream once per document tick"""
+    __slots__ = ("document", "values")
+
+    def __init__(self, document):
+        self.document = weakref.ref(document)
+        self.values = {}
+
+    def emit(self, stream, value):
+        if len(self.values) == 0:
+            self.document().add_next_tick_callback(self.flush)
+        self.values[stream] = value
+
+    def flush(self):
+        values, self.values = self.values, {}
+        with batch():
+            for stream, value in values.items():
+                stream.emit(value)
+
+
+def scheduler(document):
+    """Scheduler for a bokeh Document, Scheduler instances pass through"""
+    if hasattr(document, "call_later"):
+        return document
+    return DocumentScheduler(document)
+
+
+class DocumentScheduler(object):
+    """Time source and timers backed by bokeh Document callbacks
+
+    :param document: bokeh Document
+    """
+    __slots__ = ("document",)
+
+    def __init__(self, document):
+        self.document = document
+
+    def call_soon(self, method):
+        """Run method on the event loop, safe to call from any thread"""
+        self.document.add_next_tick_callback(method)
+
+    def call_later(self, milliseconds, method):
+        return Timer(self.document.remove_timeout_callback,
+                     self.document.add_timeout_callback(method, milliseconds))
+
+    def call_every(self, milliseconds, method):
+        return Timer(self.document.remove_periodic_callback,
+                     self.document.add_periodic_callback(method, milliseconds))
+
+
+class Timer(object):
+    """Cancellable handle to a scheduled callback"""
+    __slots__ = ("remove", "callback")
+
+    def __init__(self, remove, callback):
+        self.remove = remove
+        self.callback = callback
+
+    def cancel(self):
+        if self.callback is None:
+            return
+        try:
+            self.remove(self.callback)
+        except ValueError:
+            pass  # Callback already ran
+        self.callback = None
+
+
+class VirtualScheduler(object):
+    """Deterministic clock for tests, time moves only on advance()
+
+    >>> scheduler = VirtualScheduler()
+    >>> stream.debounce(200, scheduler).subscribe(print)
+    >>> scheduler.advance(200)
+    """
+    __slots__ = ("time", "queue", "counter", "lock")
+
+    def __init__(self, start=0):
+        self.time = start
+        self.queue = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def call_soon(self, method):
+        self.call_later(0, method)
+
+    def call_later(self, milliseconds, method):
+        with self.lock:
+            task = [self.time + milliseconds, next(self.counter), method]
+            heapq.heappush(self.queue, task)
+        return VirtualTimer(task)
+
+    def call_every(self, milliseconds, method):
+        timer = VirtualTimer(None)
+
+        def repeat():
+            timer.task = self.call_later(milliseconds, repeat).task
+            method()
+
+        timer.task = self.call_later(milliseconds, repeat).task
+        return timer
+
+    def advance(self, milliseconds):
+        """Move clock forward running callbacks that fall due"""
+        end = self.time + milliseconds
+        while len(self.queue) > 0 and self.queue[0][0] <= end:
+            with self.lock:
+                due, _, method = heapq.heappop(self.queue)
+            self.time = due
+            if method is not None:
+                method()
+        self.time = end
+
+
+class VirtualTimer(object):
+    __slots__ = ("task",)
+
+    def __init__(self, task):
+        self.task = task
+
+    def cancel(self):
+        if self.task is not None:
+            self.task[2] = None
+            self.task = None
+
+
+@contextlib.contextmanager
+def profile(profiler=None):
+    """Record time spent in each node of the stream graph
+
+    >>> with rx.profile() as profiler:
+    ...     stream.emit(1)
+    >>> print(profiler.report())
+
+    Outside this context emit only pays for a single global check
+    """
+    global PROFILER
+    if profiler is None:
+        profiler = Profiler()
+    previous, PROFILER = PROFILER, profiler
+    try:
+        yield profiler
+    finally:
+        PROFILER = previous
+
+
+class Profiler(object):
+    """Per node emit counts, fan-out and time spent in notify
+
+    Subscribers are timed as they are notified, times are inclusive
+    of the work done downstream, self time excludes it. Folded stacks
+    of self time can be drawn with flamegraph.pl or speedscope
+    """
+    __slots__ = ("clock", "nodes", "stack", "stacks")
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.nodes = {}
+        self.stack = []
+        self.stacks = Counter()
+
+    def node(self, key):
+        stats = self.nodes.get(id(key))
+        if stats is None:
+            stats = self.nodes[id(key)] = NodeStats(key)
+        return stats
+
+    def emit(self, stream, value):
+        stats = self.node(stream)
+        stats.emits += 1
+        fanout = 0
+        for uid in stream.order:
+            on_value = stream.subscribers.get(uid)
+            if on_value is not None:
+                fanout += 1
+                self.call(stream, on_value, value)
+        stats.fanout += fanout
+        stats.max_fanout = max(stats.max_fanout, fanout)
+
+    def call(self, stream, on_value, value):
+        method = on_value
+        if isinstance(method, partial):
+            method = method.func
+        node = getattr(method, "__self__", None)
+        if not isinstance(node, Stream):
+            node = on_value
+        stats = self.node(node)
+        if len(self.stack) == 0:
+            path = self.node(stream).label + ";" + stats.label
+        else:
+            path = self.stack[-1][0] + ";" + stats.label
+        frame = [path, 0]
+        self.stack.append(frame)
+        start = self.clock()
+        try:
+            on_value(value)
+        finally:
+            elapsed = self.clock() - start
+            self.stack.pop()
+            if len(self.stack) > 0:
+                self.stack[-1][1] += elapsed
+            stats.calls += 1
+            stats.time += elapsed
+            stats.self_time += elapsed - frame[1]
+            stats.max_time = max(stats.max_time, elapsed)
+            self.stacks[path] += elapsed - frame[1]
+
+    def table(self):
+        """Rows of node statistics, slowest first"""
+        rows = [stats.row() for stats in self.nodes.values()]
+        return sorted(rows, key=lambda row: row["time"], reverse=True)
+
+    def report(self):
+        """Table formatted as text with times in milliseconds"""
+        header = "{:>8} {:>8} {:>8} {:>10} {:>10} {:>10}  {}".format(
+            "calls", "emits", "fanout", "total", "self", "max", "node")
+        lines = [header]
+        for row in self.table():
+            lines.append(
+                "{calls:>8} {emits:>8} {max_fanout:>8} "
+                "{total:>10.3f} {self:>10.3f} {max:>10.3f}  {label}".format(
+                    total=1000 * row["time"],
+                    self=1000 * row["self_time"],
+                    max=1000 * row["max_time"],
+                    **row))
+        return "\n".join(lines)
+
+    def folded(self):
+        """Folded stacks, one 'a;b;c microseconds' line per path"""
+        return "\n".join(
+            "{} {}".format(path, int(round(1e6 * seconds)))
+            for path, seconds in sorted(self.stacks.items()))
+
+
+class NodeStats(object):
+    __slots__ = ("label", "calls", "emits", "fanout", "max_fanout",
+                 "time", "self_time", "max_time")
+
+    def __init__(self, node):
+        self.label = label(node)
+        self.calls = 0
+        self.emits = 0
+        self.fanout = 0
+        self.max_fanout = 0
+        self.time = 0.
+        self.self_time = 0.
+        self.max_time = 0.
+
+    def row(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def label(node):
+    """Readable name for a stream or subscriber, e.g. Map(render)@7f3a"""
+    if isinstance(node, Stream):
+        name = type(node).__name__
+        for attr in ("method", "combinator", "criteria"):
+            method = getattr(node, attr, None)
+            if method is not None:
+                name += "({})".format(qualname(method))
+                break
+        return "{}@{:x}".format(name, id(node) & 0xffff)
+    return qualname(node)
+
+
+def qualname(method):
+    if isinstance(method, partial):
+        method = method.func
+    return getattr(method, "__qualname__", type(method).__name__)
+
+
+class Subscription(object):
+    """Handle returned by register/subscribe, call it to detach"""
+    __slots__ = ("stream", "uid")
+
+    def __init__(self, stream, uid):
+        self.stream = stream
+        self.uid = uid
+
+    def __call__(self):
+        self.dispose()
+
+    def dispose(self):
+        if self.stream is not None:
+            self.stream.unsubscribe(self.uid)
+            self.stream = None
 
 
 class Stream(object):
+    """Push values to registered subscribers
+
+    Subscribers are kept in a dict so that unsubscribe is amortised
+    O(1), a list of ids preserves registration order and is compacted
+    once it is more than twice the number of subscribers, though not
+    while an emit is iterating it. Subscribers added during an emit
+    receive the value being emitted, which scan() relies on
+
+    Operators hold a Subscription for each upstream stream, when
+    the last subscriber of an operator leaves it disposes those
+    subscriptions, recursively tearing down chains that nothing
+    listens to. A new subscriber reconnects the chain
+
+    Nodes use __slots__ and subscribers are stored as plain callables
+    so an emit costs one function call per subscriber. A __dict__
+    slot is kept so instances can still be patched in tests, it is
+    only allocated when an attribute outside __slots__ is set
+    """
+    __slots__ = ("subscribers", "order", "upstream", "sources",
+                 "detached", "rank", "emitting", "__dict__")
+    uids = itertools.count()
+
     def __init__(self):
-        self.subscribers = []
-        self.observables = {}
+        self.subscribers = {}
+        self.order = []
+        self.upstream = []
+        self.sources = []
+        self.detached = False
+        self.rank = 0
+        self.emitting = 0
 
     def register(self, subscriber):
-        self.subscribers.append(subscriber)
+        return self.subscribe(subscriber.notify)
 
     def subscribe(self, on_value):
-        observable = Observable(on_value)
-        self.register(observable)
-        uid = id(observable)
-        self.observables[uid] = observable
-        return partial(self.unsubscribe, uid)
+        if self.detached:
+            self.connect()
+        uid = next(self.uids)
+        self.subscribers[uid] = on_value
+        self.order.append(uid)
+        return Subscription(self, uid)
 
     def unsubscribe(self, uid):
         assert isinstance(uid, int), "Unique ID should be int: {}".format(uid)
-        index = self.subscribers.index(self.observables[uid])
-        self.subscribers.pop(index)
+        if self.subscribers.pop(uid, None) is None:
+            return
+        if len(self.subscribers) == 0:
+            self.order = []
+            self.dispose()
+        elif self.emitting == 0:
+            self.compact()
+
+    def compact(self):
+        """Drop unsubscribed ids once order is twice the subscribers"""
+        if len(self.order) > 2 * len(self.subscribers):
+            self.order = [uid for uid in self.order
+                          if uid in self.subscribers]
+
+    def listen(self, stream, on_value=None):
+        """Subscribe to an upstream stream while self has subscribers"""
+        self.upstream.append((stream, on_value))
+        self.rank = max(self.rank, stream.rank + 1)
+        self.attach(stream, on_value)
+
+    def attach(self, stream, on_value):
+        if on_value is None:
+            subscription = stream.register(self)
+        else:
+            subscription = stream.subscribe(on_value)
+        self.sources.append(subscription)
+
+    def connect(self):
+        """Re-attach to upstream streams after dispose"""
+        self.detached = False
+        for stream, on_value in self.upstream:
+            self.attach(stream, on_value)
+
+    def dispose(self):
+        """Detach from upstream streams"""
+        sources, self.sources = self.sources, []
+        self.detached = len(self.upstream) > 0
+        for subscription in sources:
+            subscription.dispose()
 
     def emit(self, value=None):
-        for subscriber in self.subscribers:
-            subscriber.notify(value)
+        self.compact()
+        self.emitting += 1
+        try:
+            if PROFILER is not None:
+                PROFILER.emit(self, value)
+                return
+            subscribers = self.subscribers
+            for uid in self.order:
+                on_value = subscribers.get(uid)
+                if on_value is not None:
+                    on_value(value)
+        finally:
+            self.emitting -= 1
 
     def map(self, value):
         return Map(self, value)
@@ -66,15 +501,39 @@ class Stream(object):
     def log(self):
         return Log(self)
 
+    def debounce(self, milliseconds, document):
+        return Debounce(self, milliseconds, scheduler(document))
+
+    def throttle(self, milliseconds, document, leading=True, trailing=True):
+        return Throttle(self, milliseconds, scheduler(document),
+                        leading=leading, trailing=trailing)
+
+    def sample(self, milliseconds, document):
+        return Sample(self, milliseconds, scheduler(document))
+
+    def buffer_time(self, milliseconds, document):
+        return BufferTime(self, milliseconds, scheduler(document))
+
+    def distinct_until_changed(self, key=None):
+        return DistinctUntilChanged(self, key=key)
+
+    def map_async(self, method, document, executor=None):
+        return MapAsync(self, method, scheduler(document), executor)
+
+    def flat_map_latest_async(self, method, document, executor=None):
+        return FlatMapLatestAsync(self, method, scheduler(document), executor)
+
 
 class Map(Stream):
+    __slots__ = ("method",)
+
     def __init__(self, stream, method):
         if not hasattr(method, '__call__'):
             self.method = lambda x: method
         else:
             self.method = method
-        stream.register(self)
         super().__init__()
+        self.listen(stream)
 
     def notify(self, value):
         self.emit(self.method(value))
@@ -82,52 +541,73 @@ class Map(Stream):
 
 class FlatMap(Stream):
     """Flat map flattens multiple streams into single stream"""
+    __slots__ = ("method",)
+
     def __init__(self, stream, method):
         if not hasattr(method, '__call__'):
             self.method = lambda x: method
         else:
             self.method = method
-        stream.register(self)
         super().__init__()
+        self.listen(stream)
 
     def notify(self, value):
-        self.method(value).subscribe(self.emit)
+        self.listen(self.method(value), self.emit)
 
 
 class FlatMapLatest(Stream):
     """Flat map but ignores all but latest stream"""
+    __slots__ = ("method", "latest", "inner")
+
     def __init__(self, stream, method):
         if not hasattr(method, '__call__'):
             self.method = lambda x: method
         else:
             self.method = method
-        stream.register(self)
         super().__init__()
-        self.unsubscribe = None
+        self.listen(stream)
+        self.latest = None
+        self.inner = None
 
     def notify(self, value):
-        if self.unsubscribe is not None:
-            self.unsubscribe()
-        self.unsubscribe = self.method(value).subscribe(self.emit)
+        if self.inner is not None:
+            self.inner.dispose()
+        self.latest = self.method(value)
+        self.inner = self.latest.subscribe(self.emit)
+
+    def connect(self):
+        super().connect()
+        if self.latest is not None:
+            self.inner = self.latest.subscribe(self.emit)
+
+    def dispose(self):
+        if self.inner is not None:
+            self.inner.dispose()
+            self.inner = None
+        super().dispose()
 
 
 class Merge(Stream):
+    __slots__ = ("streams",)
+
     def __init__(self, *streams):
         self.streams = streams
-        for i, stream in enumerate(streams):
-            stream.subscribe(self.notify)
         super().__init__()
+        for stream in streams:
+            self.listen(stream, self.notify)
 
     def notify(self, value):
         self.emit(value)
 
 
 class Scan(Stream):
+    __slots__ = ("state", "combinator")
+
     def __init__(self, stream, initial, combinator):
         self.state = initial
         self.combinator = combinator
-        stream.register(self)
         super().__init__()
+        self.listen(stream)
 
     def notify(self, value):
         self.state = self.combinator(self.state, value)
@@ -135,10 +615,12 @@ class Scan(Stream):
 
 
 class Filter(Stream):
+    __slots__ = ("criteria",)
+
     def __init__(self, stream, criteria):
         self.criteria = criteria
-        stream.register(self)
         super().__init__()
+        self.listen(stream)
 
     def notify(self, value):
         if self.criteria(value):
@@ -146,25 +628,275 @@ class Filter(Stream):
 
 
 class Log(Stream):
+    __slots__ = ()
+
     def __init__(self, stream):
-        stream.register(self)
         super().__init__()
+        self.listen(stream)
 
     def notify(self, value):
         print(value)
         self.emit(value)
 
 
+class Debounce(Stream):
+    """Emit latest value once no value has arrived for a period"""
+    __slots__ = ("milliseconds", "scheduler", "timer")
+
+    def __init__(self, stream, milliseconds, scheduler):
+        self.milliseconds = milliseconds
+        self.scheduler = scheduler
+        self.timer = None
+        super().__init__()
+        self.listen(stream)
+
+    def notify(self, value):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = self.scheduler.call_later(
+                self.milliseconds, partial(self.fire, value))
+
+    def fire(self, value):
+        self.timer = None
+        self.emit(value)
+
+    def dispose(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        super().dispose()
+
+
+class Throttle(Stream):
+    """Emit at most one value per period
+
+    :param leading: emit the first value of a period immediately
+    :param trailing: emit the latest value seen during a period
+                     once it ends
+    """
+    __slots__ = ("milliseconds", "scheduler", "leading", "trailing",
+                 "timer", "pending", "value")
+
+    def __init__(self, stream, milliseconds, scheduler,
+                 leading=True, trailing=True):
+        self.milliseconds = milliseconds
+        self.scheduler = scheduler
+        self.leading = leading
+        self.trailing = trailing
+        self.timer = None
+        self.pending = False
+        self.value = None
+        super().__init__()
+        self.listen(stream)
+
+    def notify(self, value):
+        if self.timer is None:
+            self.timer = self.scheduler.call_later(
+                    self.milliseconds, self.fire)
+            if self.leading:
+                self.emit(value)
+                return
+        self.pending = True
+        self.value = value
+
+    def fire(self):
+        self.timer = None
+        if self.trailing and self.pending:
+            value, self.pending, self.value = self.value, False, None
+            self.timer = self.scheduler.call_later(
+                    self.milliseconds, self.fire)
+            self.emit(value)
+        else:
+            self.pending, self.value = False, None
+
+    def dispose(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.pending, self.value = False, None
+        super().dispose()
+
+
+class Sample(Stream):
+    """Emit latest value every period if a new value has arrived"""
+    __slots__ = ("milliseconds", "scheduler", "pending", "value", "timer")
+
+    def __init__(self, stream, milliseconds, scheduler):
+        self.milliseconds = milliseconds
+        self.scheduler = scheduler
+        self.pending = False
+        self.value = None
+        super().__init__()
+        self.listen(stream)
+        self.timer = scheduler.call_every(milliseconds, self.fire)
+
+    def notify(self, value):
+        self.pending = True
+        self.value = value
+
+    def fire(self):
+        if self.pending:
+            value, self.pending, self.value = self.value, False, None
+            self.emit(value)
+
+    def connect(self):
+        super().connect()
+        self.timer = self.scheduler.call_every(self.milliseconds, self.fire)
+
+    def dispose(self):
+        self.timer.cancel()
+        super().dispose()
+
+
+class BufferTime(Sample):
+    """Emit list of values collected during each period"""
+    __slots__ = ("values",)
+
+    def __init__(self, stream, milliseconds, scheduler):
+        self.values = []
+        super().__init__(stream, milliseconds, scheduler)
+
+    def notify(self, value):
+        self.values.append(value)
+
+    def fire(self):
+        if len(self.values) > 0:
+            values, self.values = self.values, []
+            self.emit(values)
+
+
+class DistinctUntilChanged(Stream):
+    """Drop values equal to the previously emitted value
+
+    :param key: function of value used for comparison
+    """
+    __slots__ = ("key", "previous")
+
+    def __init__(self, stream, key=None):
+        if key is None:
+            key = lambda value: value
+        self.key = key
+        self.previous = Empty
+        super().__init__()
+        self.listen(stream)
+
+    def notify(self, value):
+        key = self.key(value)
+        if self.previous is not Empty:
+            if equal(self.previous, key):
+                return
+        self.previous = key
+        self.emit(value)
+
+
+class MapAsync(Stream):
+    """Map values on an executor and emit results on the event loop
+
+    Only the latest value is of interest, a new value cancels any
+    pending computation and results of stale ones are dropped
+
+    >>> stream.map_async(expensive, document).subscribe(render)
+
+    :param executor: concurrent.futures executor, defaults to a shared
+                     thread pool, a ProcessPoolExecutor suits pure
+                     CPU-bound functions that can be pickled
+    """
+    __slots__ = ("method", "scheduler", "executor", "future", "generation")
+
+    def __init__(self, stream, method, scheduler, executor=None):
+        if executor is None:
+            executor = EXECUTOR
+        self.method = method
+        self.scheduler = scheduler
+        self.executor = executor
+        self.future = None
+        self.generation = 0
+        super().__init__()
+        self.listen(stream)
+
+    def notify(self, value):
+        self.cancel()
+        self.future = self.executor.submit(self.method, value)
+        self.future.add_done_callback(partial(self.done, self.generation))
+
+    def done(self, generation, future):
+        """Hand a finished future from a worker back to the event loop"""
+        if not future.cancelled():
+            self.scheduler.call_soon(partial(self.deliver, generation, future))
+
+    def deliver(self, generation, future):
+        if generation != self.generation:
+            return
+        self.future = None
+        with batch():
+            self.receive(future.result())
+
+    def receive(self, value):
+        self.emit(value)
+
+    def cancel(self):
+        self.generation += 1
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+
+    def dispose(self):
+        self.cancel()
+        super().dispose()
+
+
+class FlatMapLatestAsync(MapAsync):
+    """Build streams on an executor, emitting from the latest one"""
+    __slots__ = ("inner",)
+
+    def __init__(self, stream, method, scheduler, executor=None):
+        self.inner = None
+        super().__init__(stream, method, scheduler, executor)
+
+    def receive(self, stream):
+        self.inner = stream.subscribe(self.emit)
+
+    def cancel(self):
+        if self.inner is not None:
+            self.inner.dispose()
+            self.inner = None
+        super().cancel()
+
+
+class Empty(object):
+    """Sentinel for streams that have not seen a value"""
+
+
+def equal(a, b):
+    result = a == b
+    if hasattr(result, "all"):
+        return bool(result.all())
+    return bool(result)
+
+
 class CombineLatest(Stream):
+    """Emit a tuple of the latest value of each stream
+
+    Inside a batch the emit is deferred so that several inputs
+    changing together produce a single glitch-free tuple
+    """
+    __slots__ = ("streams", "state")
+
     def __init__(self, *streams):
         self.streams = streams
         self.state = [None for _ in streams]
-        for i, stream in enumerate(streams):
-            stream.subscribe(partial(self.notify, i))
         super().__init__()
+        for i, stream in enumerate(streams):
+            self.listen(stream, partial(self.notify, i))
 
     def notify(self, index, value):
         self.state[index] = value
+        if BATCH is None:
+            self.emit(tuple(self.state))
+        else:
+            BATCH.defer(self)
+
+    def flush(self):
         self.emit(tuple(self.state))
 
 
@@ -172,6 +904,10 @@ def combine_latest(*streams):
     return CombineLatest(*streams)
 
 
+def merge(*streams):
+    return Merge(*streams)
+
+
 def scan_reset(stream, accumulator, reset):
     """Accumulate values with a stream to reset the seed"""
     return reset.flat_map_latest(lambda seed: stream.scan(seed, accumulator))
@@ -124,6 +124,50 @@ class TestChronometer(unittest.TestCase):
         self.assertEqual(expect, result)
 
 
+class TestDatetimes(unittest.TestCase):
+    def test_datetimes_given_datetime_list(self):
+        result = chronometer.datetimes([dt.datetime(2018, 1, 1)])
+        expect = np.array(["2018-01-01"], dtype="datetime64[ms]")
+        np.testing.assert_array_equal(expect, result)
+
+    def test_datetimes_given_milliseconds(self):
+        result = chronometer.datetimes([1514764800000.])
+        expect = np.array(["2018-01-01"], dtype="datetime64[ms]")
+        np.testing.assert_array_equal(expect, result)
+
+    def test_chronometer_keeps_datetime64_columns(self):
+        source = bokeh.models.ColumnDataSource({
+            "valid": chronometer.datetimes([0, 12]),
+            "start": chronometer.datetimes([0, 0]),
+            "offset": [0, 12]
+            })
+        figure, _, _, _ = chronometer.chronometer(
+                valid="valid",
+                start="start",
+                offset="offset",
+                source=source)
+        source.selected.indices = [0]
+        source.stream({
+            "valid": chronometer.datetimes([24]),
+            "start": chronometer.datetimes([0]),
+            "offset": [24]
+            })
+        second_source = figure.renderers[1].data_source
+        for data in [source.data, second_source.data]:
+            for key in ["valid", "start"]:
+                self.assertEqual(data[key].dtype, "datetime64[ms]")
+        self.assertEqual(len(second_source.data["valid"]), 3)
+
+    def test_select_given_datetime64_columns(self):
+        source = bokeh.models.ColumnDataSource({
+            "valid": chronometer.datetimes([0, 1, 2]),
+            "start": chronometer.datetimes([0, 0, 1]),
+            "offset": [0, 1, 1]
+            })
+        result = chronometer.select("start")(source, 1)
+        np.testing.assert_array_equal(result[0], [0, 1])
+
+
 class TestPartial(unittest.TestCase):
     def test_partial_kwargs(self):
         def method(dummy, a=None):
@@ -162,3 +206,149 @@ class TestTicker(unittest.TestCase):
     def check(self, max_hour, expect):
         result = chronometer.ticks(max_hour)
         self.assertEqual(expect, result)
+
+
+class TestIndex(unittest.TestCase):
+    def setUp(self):
+        self.source = bokeh.models.ColumnDataSource({
+            "valid": [0, 1, 1, 2],
+            "offset": [0, 12, 0, 12],
+            "start": [0, 0, 1, 1]
+            })
+
+    def test_select(self):
+        result = chronometer.select("start")(self.source, 2)
+        np.testing.assert_array_equal(result[0], [2, 3])
+
+    def test_select_memoized_within_group(self):
+        selector = chronometer.select("start")
+        first = selector(self.source, 2)[0]
+        self.assertIs(selector(self.source, 3)[0], first)
+        self.assertFalse(first.flags.writeable)
+
+    def test_select_invalidated_by_stream(self):
+        selector = chronometer.select("start")
+        selector(self.source, 0)
+        self.source.stream({"valid": [3], "offset": [24], "start": [0]})
+        result = selector(self.source, 0)
+        np.testing.assert_array_equal(result[0], [0, 1, 4])
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = chronometer.LRU(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_index_find_given_two_columns(self):
+        index = chronometer.indexed(self.source, ("valid", "offset"))
+        self.assertEqual(index.find((1, 0)), [2])
+
+    def test_index_follows_stream(self):
+        index = chronometer.indexed(self.source, "start")
+        self.source.stream({"valid": [3], "offset": [24], "start": [0]})
+        self.assertEqual(index.group(0), [0, 1, 4])
+
+    def test_index_follows_patch(self):
+        index = chronometer.indexed(self.source, "start")
+        self.source.patch({"start": [(0, 1)]})
+        self.assertEqual(index.group(0), [0, 2, 3])
+
+    def test_index_given_numpy_datetimes(self):
+        source = bokeh.models.ColumnDataSource({
+            "start": np.array(["2018-01-01", "2018-01-01"],
+                              dtype="datetime64[ms]")
+            })
+        index = chronometer.indexed(source, "start")
+        self.assertEqual(index.find((dt.datetime(2018, 1, 1),)), [0, 1])
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.source = bokeh.models.ColumnDataSource({
+            "valid": [0, 12],
+            "offset": [0, 12],
+            "start": [0, 0]
+            })
+        self.radio_group = bokeh.models.RadioGroup(
+                labels=["Run"], active=0)
+        self.figure, _, _, _ = chronometer.chronometer(
+                valid="valid",
+                start="start",
+                offset="offset",
+                source=self.source,
+                radio_group=self.radio_group,
+                selectors={
+                    0: chronometer.select("start")
+                })
+
+    def second_source(self):
+        renderer = self.figure.renderers[1]
+        return renderer.data_source
+
+    def test_stream_extends_highlighted_run(self):
+        self.source.selected.indices = [0]
+        self.source.stream({
+            "valid": [24, 12],
+            "offset": [24, 0],
+            "start": [0, 12]
+            })
+        self.assertEqual(self.second_source().data["valid"], [0, 12, 24])
+
+    def test_stream_extends_ticks(self):
+        self.source.stream({
+            "valid": [48],
+            "offset": [48],
+            "start": [0]
+            })
+        self.assertEqual(self.figure.yaxis[0].ticker.ticks, [0, 24, 48])
+
+    def test_stream_given_timedelta_offsets(self):
+        self.source.data = {
+            "valid": [],
+            "offset": [],
+            "start": []
+            }
+        self.source.stream({
+            "valid": [dt.datetime(2018, 1, 1)],
+            "offset": [dt.timedelta(hours=9)],
+            "start": [dt.datetime(2018, 1, 1)]
+            })
+        self.assertEqual(self.figure.yaxis[0].ticker.ticks, [0, 3, 6, 9])
+
+
+class TestWatcher(unittest.TestCase):
+    def test_watcher_given_stream_calls_on_append(self):
+        source = bokeh.models.ColumnDataSource({"x": [1, 2]})
+        on_append = unittest.mock.Mock()
+        on_reset = unittest.mock.Mock()
+        chronometer.watch(source).subscribe(on_append, on_reset)
+        source.stream({"x": [3]})
+        on_append.assert_called_once_with(source.data, 2)
+        on_reset.assert_not_called()
+
+    def test_watcher_given_patch_calls_on_reset(self):
+        source = bokeh.models.ColumnDataSource({"x": [1, 2]})
+        on_append = unittest.mock.Mock()
+        on_reset = unittest.mock.Mock()
+        chronometer.watch(source).subscribe(on_append, on_reset)
+        source.patch({"x": [(0, 5)]})
+        on_reset.assert_called_once_with(source.data)
+        on_append.assert_not_called()
+
+    def test_watcher_given_longer_data_calls_on_reset(self):
+        source = bokeh.models.ColumnDataSource({"x": [1, 2, 3]})
+        on_append = unittest.mock.Mock()
+        on_reset = unittest.mock.Mock()
+        chronometer.watch(source).subscribe(on_append, on_reset)
+        source.data = {"x": [1, 9, 3, 4]}
+        on_reset.assert_called_once_with(source.data)
+        on_append.assert_not_called()
+
+    def test_index_follows_replaced_data(self):
+        source = bokeh.models.ColumnDataSource({"start": [1, 2, 3]})
+        index = chronometer.indexed(source, "start")
+        source.data = {"start": [1, 9, 3, 4]}
+        self.assertEqual(list(index.find((9,))), [1])
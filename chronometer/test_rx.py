@@ -1,4 +1,7 @@
 import unittest
+import threading
+import concurrent.futures
+import bokeh.document
 import rx
 
 
@@ -71,3 +74,319 @@ class TestRx(unittest.TestCase):
         result = history.events
         expect = [10, 11, 10, 20, 21, 30, 29]
         self.assertEqual(expect, result)
+
+
+class TestSubscriptions(unittest.TestCase):
+    def test_subscribe_returns_callable_unsubscribe(self):
+        stream = rx.Stream()
+        history = []
+        unsubscribe = stream.subscribe(history.append)
+        stream.emit(1)
+        unsubscribe()
+        stream.emit(2)
+        self.assertEqual(history, [1])
+
+    def test_unsubscribe_compacts_order(self):
+        stream = rx.Stream()
+        stream.subscribe(lambda value: None)
+        for _ in range(10000):
+            stream.subscribe(lambda value: None)()
+        self.assertLessEqual(len(stream.order), 2 * len(stream.subscribers))
+
+    def test_unsubscribe_during_emit(self):
+        stream = rx.Stream()
+        history = []
+        subscription = None
+
+        def once(value):
+            subscription.dispose()
+            history.append(("once", value))
+
+        subscription = stream.subscribe(once)
+        stream.subscribe(lambda value: history.append(("always", value)))
+        stream.emit(1)
+        stream.emit(2)
+        self.assertEqual(history, [
+            ("once", 1), ("always", 1), ("always", 2)])
+
+    def test_dispose_tears_down_operator_chain(self):
+        stream = rx.Stream()
+        subscription = stream.map(
+            lambda x: x + 1).filter(bool).subscribe(print)
+        self.assertEqual(len(stream.subscribers), 1)
+        subscription.dispose()
+        self.assertEqual(len(stream.subscribers), 0)
+
+    def test_flat_map_latest_releases_previous_streams(self):
+        clicks = rx.Stream()
+        indices = rx.Stream()
+        result = rx.scan_reset_emit_seed(
+                clicks, lambda a, i: a + i,
+                reset=indices)
+        result.subscribe(lambda value: None)
+        for i in range(100):
+            indices.emit(i)
+        self.assertEqual(len(clicks.subscribers), 1)
+        self.assertEqual(len(indices.subscribers), 2)
+
+    def test_resubscribe_reconnects_operator(self):
+        stream = rx.Stream()
+        mapped = stream.map(lambda x: 2 * x)
+        mapped.subscribe(print)()
+        history = []
+        mapped.subscribe(history.append)
+        stream.emit(2)
+        self.assertEqual(history, [4])
+
+
+class TestBatch(unittest.TestCase):
+    def test_combine_latest_emits_once_per_batch(self):
+        x, y = rx.Stream(), rx.Stream()
+        history = []
+        rx.combine_latest(x, y).subscribe(history.append)
+        with rx.batch():
+            x.emit(1)
+            y.emit(2)
+            x.emit(3)
+        self.assertEqual(history, [(3, 2)])
+
+    def test_diamond_is_glitch_free(self):
+        source = rx.Stream()
+        left = source.map(lambda x: x + 1)
+        right = source.map(lambda x: x * 10)
+        inner = rx.combine_latest(left, right)
+        outer = rx.combine_latest(inner, source)
+        history = []
+        outer.subscribe(history.append)
+        with rx.batch():
+            source.emit(1)
+        self.assertEqual(history, [((2, 10), 1)])
+
+    def test_callback_emits_inside_batch(self):
+        x, y = rx.Stream(), rx.Stream()
+        history = []
+        rx.combine_latest(x, y).subscribe(history.append)
+        x.subscribe(lambda value: y.emit(-value))
+        rx.callback(x)("attr", None, 1)
+        self.assertEqual(history, [(1, -1)])
+
+    def test_document_coalesces_values_per_tick(self):
+        document = bokeh.document.Document()
+        x, y = rx.Stream(), rx.Stream()
+        history = []
+        rx.combine_latest(x, y).subscribe(history.append)
+        on_x, on_y = rx.callback(x, document), rx.callback(y, document)
+        on_x("start", None, 0)
+        on_x("start", 0, 1)
+        on_y("end", None, 2)
+        self.assertEqual(history, [])
+        callbacks = document.session_callbacks
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0].callback()
+        self.assertEqual(history, [(1, 2)])
+
+
+class TestTime(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = rx.VirtualScheduler()
+        self.stream = rx.Stream()
+        self.history = []
+
+    def emit(self, *values, every=0):
+        for value in values:
+            self.stream.emit(value)
+            self.scheduler.advance(every)
+
+    def test_debounce(self):
+        self.stream.debounce(100, self.scheduler).subscribe(
+            self.history.append)
+        self.emit(1, 2, 3, every=50)
+        self.assertEqual(self.history, [])
+        self.scheduler.advance(100)
+        self.assertEqual(self.history, [3])
+
+    def test_throttle_leading_and_trailing(self):
+        self.stream.throttle(100, self.scheduler).subscribe(
+            self.history.append)
+        self.emit(1, 2, 3, every=40)
+        self.assertEqual(self.history, [1, 3])
+        self.scheduler.advance(200)
+        self.assertEqual(self.history, [1, 3])
+
+    def test_throttle_leading_only(self):
+        self.stream.throttle(100, self.scheduler, trailing=False).subscribe(
+            self.history.append)
+        self.emit(1, 2, 3, 4, every=40)
+        self.assertEqual(self.history, [1, 4])
+
+    def test_throttle_trailing_only(self):
+        self.stream.throttle(100, self.scheduler, leading=False).subscribe(
+            self.history.append)
+        self.emit(1, 2, every=40)
+        self.scheduler.advance(100)
+        self.assertEqual(self.history, [2])
+
+    def test_sample(self):
+        self.stream.sample(100, self.scheduler).subscribe(
+            self.history.append)
+        self.emit(1, 2, every=50)
+        self.emit(3, every=300)
+        self.assertEqual(self.history, [2, 3])
+
+    def test_buffer_time(self):
+        self.stream.buffer_time(100, self.scheduler).subscribe(
+            self.history.append)
+        self.emit(1, 2, every=50)
+        self.emit(3, every=300)
+        self.assertEqual(self.history, [[1, 2], [3]])
+
+    def test_dispose_cancels_timers(self):
+        subscription = self.stream.debounce(100, self.scheduler).subscribe(
+            self.history.append)
+        self.emit(1)
+        subscription.dispose()
+        self.scheduler.advance(100)
+        self.assertEqual(self.history, [])
+
+    def test_distinct_until_changed(self):
+        self.stream.distinct_until_changed().subscribe(self.history.append)
+        self.emit(1, 1, 2, 2, 1)
+        self.assertEqual(self.history, [1, 2, 1])
+
+    def test_document_scheduler(self):
+        document = bokeh.document.Document()
+        self.stream.debounce(100, document).subscribe(self.history.append)
+        self.emit(1, 2)
+        self.assertEqual(len(document.session_callbacks), 1)
+
+
+class TestOperators(unittest.TestCase):
+    def test_filter_keeps_values_matching_criteria(self):
+        stream = rx.Stream()
+        history = []
+        stream.filter(lambda x: x > 1).subscribe(history.append)
+        for value in [1, 2, 3]:
+            stream.emit(value)
+        self.assertEqual(history, [2, 3])
+
+    def test_merge(self):
+        x, y = rx.Stream(), rx.Stream()
+        history = []
+        rx.merge(x, y).subscribe(history.append)
+        x.emit(1)
+        y.emit(2)
+        self.assertEqual(history, [1, 2])
+
+    def test_nodes_use_slots(self):
+        stream = rx.Stream().map(lambda x: x).filter(bool)
+        stream.subscribe(print)
+        self.assertEqual(stream.__dict__, {})
+
+
+class TestAsync(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = rx.VirtualScheduler()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.stream = rx.Stream()
+        self.history = []
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def wait(self, operator):
+        if operator.future is not None:
+            concurrent.futures.wait([operator.future])
+        self.scheduler.advance(0)
+
+    def test_map_async_emits_on_scheduler(self):
+        mapped = self.stream.map_async(
+            lambda x: 2 * x, self.scheduler, self.executor)
+        mapped.subscribe(self.history.append)
+        self.stream.emit(2)
+        concurrent.futures.wait([mapped.future])
+        self.assertEqual(self.history, [])
+        self.scheduler.advance(0)
+        self.assertEqual(self.history, [4])
+
+    def test_map_async_drops_stale_results(self):
+        release = threading.Event()
+
+        def slow(x):
+            release.wait(1)
+            return x
+        mapped = self.stream.map_async(slow, self.scheduler, self.executor)
+        mapped.subscribe(self.history.append)
+        self.stream.emit(1)
+        first = mapped.future
+        self.stream.emit(2)
+        release.set()
+        concurrent.futures.wait([first])
+        self.wait(mapped)
+        self.assertEqual(self.history, [2])
+
+    def test_flat_map_latest_async_switches_inner_stream(self):
+        inners = {1: rx.Stream(), 2: rx.Stream()}
+        mapped = self.stream.flat_map_latest_async(
+            inners.get, self.scheduler, self.executor)
+        mapped.subscribe(self.history.append)
+        self.stream.emit(1)
+        self.wait(mapped)
+        inners[1].emit("a")
+        self.stream.emit(2)
+        self.wait(mapped)
+        inners[1].emit("b")
+        inners[2].emit("c")
+        self.assertEqual(self.history, ["a", "c"])
+        self.assertEqual(len(inners[1].subscribers), 0)
+
+
+class TestProfile(unittest.TestCase):
+    def setUp(self):
+        ticks = iter(range(1000))
+        self.profiler = rx.Profiler(clock=lambda: next(ticks))
+
+    def test_counts_emits_calls_and_fanout(self):
+        source = rx.Stream()
+        doubled = source.map(lambda x: 2 * x)
+        doubled.subscribe(lambda x: None)
+        doubled.subscribe(lambda x: None)
+        with rx.profile(self.profiler):
+            source.emit(1)
+            source.emit(2)
+        self.assertIsNone(rx.PROFILER)
+        stats = self.profiler.node(doubled)
+        self.assertEqual(stats.calls, 2)
+        self.assertEqual(stats.emits, 2)
+        self.assertEqual(stats.max_fanout, 2)
+
+    def test_self_time_excludes_downstream(self):
+        source = rx.Stream()
+        mapped = source.map(lambda x: x)
+        mapped.subscribe(lambda x: None)
+        with rx.profile(self.profiler):
+            source.emit(1)
+        stats = self.profiler.node(mapped)
+        self.assertEqual(stats.time, 3)
+        self.assertEqual(stats.self_time, 2)
+
+    def test_folded_stacks(self):
+        source = rx.Stream()
+
+        def render(x):
+            pass
+        mapped = source.map(lambda x: x)
+        mapped.subscribe(render)
+        with rx.profile(self.profiler):
+            source.emit(1)
+        lines = self.profiler.folded().split("\n")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(
+            rx.label(source) + ";" + rx.label(mapped) + ";"))
+        self.assertIn("render 1000000", lines[1])
+
+    def test_report(self):
+        source = rx.Stream()
+        source.subscribe(print)
+        with rx.profile(self.profiler):
+            pass
+        self.assertIn("calls", self.profiler.report())
@@ -1,10 +1,14 @@
+import os
+import sys
 import bokeh.plotting
-import cartopy
 import numpy as np
 from functools import partial
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import assets
 
 
 def coastlines(scale="110m"):
+    import cartopy.feature  # Deferred, pre-warmed by server_lifecycle.py
     xs, ys = [], []
     feature = cartopy.feature.COASTLINE
     feature.scale = scale
@@ -39,7 +43,7 @@ def combine_latest():
 
 
 def main():
-    xs, ys = coastlines()
+    xs, ys = assets.get(("coastlines", "110m"), coastlines)
     figure = bokeh.plotting.figure(sizing_mode="stretch_both")
     figure.multi_line(xs, ys)
 
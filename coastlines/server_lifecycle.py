@@ -0,0 +1,5 @@
+"""Pre-warm cartopy.feature once per server process"""
+
+
+def on_server_loaded(server_context):
+    import cartopy.feature  # noqa: F401
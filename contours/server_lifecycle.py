@@ -0,0 +1,7 @@
+"""Pre-warm matplotlib contouring modules once per server process"""
+
+
+def on_server_loaded(server_context):
+    import matplotlib.colors  # noqa: F401
+    import matplotlib.contour  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
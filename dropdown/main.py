@@ -1,6 +1,10 @@
-import forest
+import os
+import sys
 import bokeh.plotting
 import bokeh.layouts
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "chronometer"))
+import rx
 
 
 def parse_item(word):
@@ -39,7 +43,7 @@ def controls(stream):
     return bokeh.layouts.row(*buttons, dropdown)
 
 
-stream = forest.Stream()
+stream = rx.Stream()
 root = controls(stream)
 stream.emit("A")
 stream.emit("B")
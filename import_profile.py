@@ -0,0 +1,80 @@
+"""Session start up profile of bokeh apps
+
+Each app's main.py is executed twice in a fresh interpreter, the
+first run pays for imports, the second is what every later session
+costs once imports are cached. Apps with a server_lifecycle.py import
+their heavy packages in on_server_loaded, so that cost is paid when
+the server starts rather than by the first session.
+The heaviest top level imports are listed from python -X importtime
+
+Usage: python import_profile.py [app ...]
+"""
+import os
+import sys
+import subprocess
+
+
+APPS = [
+    "mercator",
+    "one_to_two_figure",
+    "streamplot",
+    "contours",
+    "barbs",
+    "coastlines"]
+
+SESSIONS = """
+import os, sys, time, runpy
+sys.path.insert(0, os.getcwd())
+times = []
+for _ in range(2):
+    start = time.perf_counter()
+    runpy.run_path("main.py", run_name="bk_profile")
+    times.append(time.perf_counter() - start)
+print(*times)
+"""
+
+
+def heaviest(stderr, n=3):
+    """Top level packages with largest cumulative import time in seconds"""
+    packages = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue  # nested import or header
+        packages.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(packages, reverse=True)[:n]
+
+
+def profile(app, timeout=120):
+    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), app)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SESSIONS],
+        cwd=directory,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        timeout=timeout)
+    if result.returncode != 0:
+        return None, None, result.stderr.strip().splitlines()[-1:]
+    first, later = map(float, result.stdout.split()[-2:])
+    return first, later, heaviest(result.stderr)
+
+
+def main(apps):
+    print("{:<20} {:>12} {:>12}  {}".format(
+        "app", "first (s)", "later (s)", "heaviest imports"))
+    for app in apps:
+        first, later, imports = profile(app)
+        if first is None:
+            print("{:<20} failed: {}".format(app, " ".join(imports)))
+            continue
+        print("{:<20} {:12.3f} {:12.3f}  {}".format(
+            app, first, later, ", ".join(
+                "{} {:.2f}s".format(name, seconds)
+                for seconds, name in imports)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or APPS)
@@ -0,0 +1,70 @@
+"""Compare per pixel loop against vectorized procedural image
+
+Usage: python benchmark.py [--stress]
+
+--stress streams chunked images up to 16k x 16k without holding
+the whole image in memory
+"""
+import sys
+import timeit
+import numpy as np
+import procedural
+
+
+def loop_pixels(N, M):
+    """Original per pixel implementation, kept as a reference"""
+    container = np.empty((M, N), dtype=np.uint32)
+    view = container.view(dtype=np.uint8).reshape(M, N, 4)
+    alpha = 255
+    for i in range(M):
+        if i % 2 == 0:
+            red = 158
+        else:
+            red = 0
+        for j in range(N):
+            if (i*M + j) % 2 == 0:
+                green = int((i / N) * 255)
+                blue = int((j / M) * 255)
+            else:
+                green = int((j / M) * 255)
+                blue = int((i / N) * 255)
+            view[i, j, 0] = red
+            view[i, j, 1] = green % 256  # NumPy 1 wrapped silently
+            view[i, j, 2] = blue % 256
+            view[i, j, 3] = alpha
+    return container
+
+
+def best_of(func, *args, number=3, **kwargs):
+    return min(timeit.repeat(lambda: func(*args, **kwargs),
+                             number=1, repeat=number))
+
+
+def stream(N, M):
+    for _ in procedural.pixel_chunks(N, M):
+        pass
+
+
+def benchmark(sizes=((180, 90), (900, 450), (1800, 900))):
+    print("{:>12} {:>12} {:>14} {:>8}".format(
+        "image", "loop (s)", "vectorized (s)", "speedup"))
+    for N, M in sizes:
+        loop = best_of(loop_pixels, N, M, number=1)
+        vectorized = best_of(procedural.pixels, N, M)
+        print("{:>12} {:12.4f} {:14.4f} {:8.0f}".format(
+            "{}x{}".format(N, M), loop, vectorized, loop / vectorized))
+
+
+def stress(sizes=(2048, 4096, 8192, 16384)):
+    print("{:>12} {:>12} {:>14}".format(
+        "image", "chunked (s)", "Mpixel/s"))
+    for n in sizes:
+        seconds = best_of(stream, n, n, number=1)
+        print("{:>12} {:12.3f} {:14.1f}".format(
+            "{}x{}".format(n, n), seconds, n * n / seconds / 1e6))
+
+
+if __name__ == '__main__':
+    benchmark()
+    if "--stress" in sys.argv:
+        stress()
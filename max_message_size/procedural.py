@@ -0,0 +1,79 @@
+"""Procedural RGBA test image
+
+The pattern is built from broadcast row and column index grids and
+written channel by channel into a uint8 view of the uint32 container
+that image_rgba expects
+
+>>> rgba = pixels(1800, 900)
+
+Images too large to hold in memory are generated in blocks of rows,
+either streamed or written into an existing array such as np.memmap
+
+>>> for start, block in pixel_chunks(16384, 16384):
+...     handle(start, block)
+"""
+import numpy as np
+
+
+CHUNK_BYTES = 16 * 2**20
+
+
+def pixels(N, M, out=None, rows=None):
+    """RGBA image with N columns and M rows packed into uint32
+
+    :param out: optional (M, N) uint32 array to fill, e.g. np.memmap
+    :param rows: number of rows generated at a time, bounds the size
+                 of temporary arrays, see chunk_rows()
+    :returns: (M, N) uint32 array
+    """
+    if out is None:
+        out = np.empty((M, N), dtype=np.uint32)
+    if rows is None:
+        rows = chunk_rows(N)
+    for start in range(0, M, rows):
+        fill(out[start:start + rows], start, N, M)
+    return out
+
+
+def pixel_chunks(N, M, rows=None):
+    """Generate (start, block) pairs covering the image M rows at a time
+
+    The same block buffer is refilled on every step, copy it if it
+    is needed after the next iteration
+    """
+    if rows is None:
+        rows = chunk_rows(N)
+    buffer = np.empty((min(rows, M), N), dtype=np.uint32)
+    for start in range(0, M, rows):
+        block = buffer[:min(rows, M - start)]
+        fill(block, start, N, M)
+        yield start, block
+
+
+def chunk_rows(N, nbytes=CHUNK_BYTES):
+    """Rows of an N column image that fit in roughly nbytes"""
+    return max(1, nbytes // (4 * N))
+
+
+def fill(block, start, N, M):
+    """Write rows start, start + 1, ... of the pattern into block
+
+    Channels match the original per pixel loop exactly, including
+    values past 255 wrapping around in uint8
+    """
+    view = block.view(dtype=np.uint8).reshape(block.shape + (4,))
+    i = np.arange(start, start + len(block))
+    j = np.arange(N)
+    row = channel(i / N)[:, np.newaxis]
+    column = channel(j / M)[np.newaxis, :]
+    even = ((i * M) % 2)[:, np.newaxis] == (j % 2)[np.newaxis, :]
+    view[..., 0] = np.where(i % 2 == 0, 158, 0).astype(np.uint8)[:, np.newaxis]
+    view[..., 1] = np.where(even, row, column)
+    view[..., 2] = np.where(even, column, row)
+    view[..., 3] = 255
+    return block
+
+
+def channel(fraction):
+    """Truncate fraction * 255 like int() and wrap into uint8"""
+    return (fraction * 255).astype(np.int64).astype(np.uint8)
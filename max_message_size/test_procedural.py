@@ -0,0 +1,46 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import numpy as np
+import procedural
+import benchmark
+
+
+class TestPixels(unittest.TestCase):
+    def test_matches_loop(self):
+        for N, M in [(18, 9), (9, 18), (7, 5), (1, 1)]:
+            np.testing.assert_array_equal(
+                procedural.pixels(N, M), benchmark.loop_pixels(N, M))
+
+    def test_matches_loop_past_255(self):
+        # j / M * 255 exceeds 255 when N > M, wraps like the loop
+        N, M = 60, 3
+        np.testing.assert_array_equal(
+            procedural.pixels(N, M), benchmark.loop_pixels(N, M))
+
+    def test_rows_independent_of_chunking(self):
+        expect = procedural.pixels(31, 17)
+        for rows in [1, 4, 17, 100]:
+            np.testing.assert_array_equal(
+                procedural.pixels(31, 17, rows=rows), expect)
+
+    def test_fills_out(self):
+        out = np.zeros((9, 18), dtype=np.uint32)
+        result = procedural.pixels(18, 9, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out, benchmark.loop_pixels(18, 9))
+
+
+class TestPixelChunks(unittest.TestCase):
+    def test_chunks_cover_image(self):
+        N, M = 31, 17
+        expect = procedural.pixels(N, M)
+        starts = []
+        for start, block in procedural.pixel_chunks(N, M, rows=5):
+            starts.append(start)
+            np.testing.assert_array_equal(
+                block, expect[start:start + len(block)])
+        self.assertEqual(starts, [0, 5, 10, 15])
+
+    def test_chunk_rows(self):
+        self.assertEqual(procedural.chunk_rows(1024, nbytes=4096 * 8), 8)
+        self.assertEqual(procedural.chunk_rows(10**9), 1)
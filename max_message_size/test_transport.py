@@ -0,0 +1,109 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import numpy as np
+import bokeh.models
+import transport
+
+
+class Ticks(list):
+    """Collect deferred callbacks and run them in order"""
+    def run(self):
+        while self:
+            self.pop(0)()
+
+
+class TestMeasure(unittest.TestCase):
+    def test_measure_counts_array_bytes(self):
+        values = np.random.random(2**16)
+        self.assertGreaterEqual(transport.measure({"x": values}),
+                                values.nbytes)
+
+    def test_measure_patch_with_slices(self):
+        patch = {"image": [((0, slice(0, 2), slice(None)),
+                            np.zeros(8, dtype=np.uint32))]}
+        self.assertGreater(transport.measure(patch), 32)
+
+
+class TestChunks(unittest.TestCase):
+    def test_stream_chunks_fit_budget(self):
+        data = {"x": np.arange(10000.), "y": np.arange(10000.)}
+        chunks = transport.stream_chunks(data, budget=20000)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(transport.measure(chunk), 20000)
+        np.testing.assert_array_equal(
+            np.concatenate([c["x"] for c in chunks]), data["x"])
+
+    def test_stream_chunks_small_data_single_chunk(self):
+        data = {"x": [1, 2, 3]}
+        self.assertEqual(transport.stream_chunks(data), [data])
+
+    def test_image_strips_tile_image(self):
+        image = np.arange(200 * 50, dtype=np.uint32).reshape(200, 50)
+        strips = transport.image_strips(image, 0, 10, 4, 20, budget=8000)
+        self.assertGreater(len(strips), 1)
+        for strip in strips:
+            self.assertLessEqual(transport.measure(strip), 8000)
+        np.testing.assert_array_equal(
+            np.concatenate([s["image"][0] for s in strips]), image)
+        ys = [s["y"][0] for s in strips]
+        dhs = [s["dh"][0] for s in strips]
+        self.assertEqual(ys[0], 10)
+        np.testing.assert_allclose(np.add(ys, dhs)[:-1], ys[1:])
+        self.assertAlmostEqual(sum(dhs), 20)
+
+    def test_single_row_over_budget_sent_alone(self):
+        image = np.zeros((3, 1000), dtype=np.uint32)
+        strips = transport.image_strips(image, 0, 0, 1, 1, budget=10)
+        self.assertEqual(len(strips), 3)
+
+    def test_patch_chunks_rebuild_array(self):
+        source = bokeh.models.ColumnDataSource({
+            "image": [np.zeros((100, 40), dtype=np.uint32)]})
+        values = np.arange(4000, dtype=np.uint32).reshape(100, 40)
+        chunks = transport.patch_chunks("image", 0, values, budget=5000)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(transport.measure(chunk), 5000)
+            source.patch(chunk)
+        np.testing.assert_array_equal(source.data["image"][0], values)
+
+
+class TestTransfer(unittest.TestCase):
+    def setUp(self):
+        self.ticks = Ticks()
+        self.progress = bokeh.models.Div()
+        self.source = bokeh.models.ColumnDataSource(transport.empty_image())
+        self.image = np.arange(300 * 20, dtype=np.uint32).reshape(300, 20)
+        self.chunks = transport.image_strips(
+            self.image, 0, 0, 1, 1, budget=4000)
+
+    def transfer(self, **kwargs):
+        return transport.Transfer(
+            None, self.source, self.chunks,
+            progress=self.progress, schedule=self.ticks.append, **kwargs)
+
+    def test_one_chunk_per_tick(self):
+        transfer = self.transfer()
+        transfer.start()
+        self.assertEqual(len(self.source.data["image"]), 0)
+        self.ticks.pop(0)()
+        self.assertEqual(len(self.source.data["image"]), 1)
+        self.ticks.run()
+        self.assertTrue(transfer.done)
+        np.testing.assert_array_equal(
+            np.concatenate(self.source.data["image"]), self.image)
+
+    def test_progress(self):
+        transfer = self.transfer()
+        transfer.start()
+        total = len(self.chunks)
+        self.assertEqual(self.progress.text,
+                         "Received 0 of {} chunks (0%)".format(total))
+        self.ticks.run()
+        self.assertEqual(self.progress.text,
+                         "Received {0} of {0} chunks (100%)".format(total))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            self.transfer(method="replace")
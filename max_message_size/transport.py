@@ -0,0 +1,159 @@
+"""Chunked ColumnDataSource updates
+
+Large columns are split into a sequence of ``stream`` or ``patch``
+payloads whose serialized size is kept under a byte budget, so no
+single websocket message needs ``--websocket-max-message-size`` to
+be raised. BokehJS reassembles the pieces as it applies each event
+
+>>> progress = bokeh.models.Div()
+>>> source = bokeh.models.ColumnDataSource(empty_image())
+>>> chunks = image_strips(rgba, x=-19, y=-13, dw=72, dh=36)
+>>> Transfer(document, source, chunks, progress=progress).start()
+
+Sizes are measured with the same encoder the server uses to send
+document patches
+"""
+import math
+from bokeh.core.json_encoder import serialize_json
+try:
+    from bokeh.core.serialization import Serializer
+except ImportError:  # Bokeh < 3 encodes arrays inside serialize_json
+    Serializer = None
+
+
+BUDGET = 4 * 2**20
+
+
+def measure(value):
+    """Serialized size in bytes of a stream or patch payload
+
+    Bokeh 3 sends arrays as binary buffers next to the JSON content,
+    both are counted
+    """
+    if Serializer is None:
+        return len(serialize_json(value))
+    serializer = Serializer(deferred=True)
+    content = serializer.encode(value)
+    return len(serialize_json(content)) + sum(
+        memoryview(buffer.data).nbytes for buffer in serializer.buffers)
+
+
+def stream_chunks(data, budget=BUDGET):
+    """Split equal length columns into payloads for source.stream()
+
+    A single row larger than budget is still sent on its own
+    """
+    length = len(next(iter(data.values())))
+    def take(start, stop):
+        return {name: column[start:stop] for name, column in data.items()}
+    return [chunk for _, _, chunk in split(take, 0, length, budget)]
+
+
+def image_strips(image, x, y, dw, dh, budget=BUDGET):
+    """Split an image into horizontal strips, one streamed row each
+
+    Strip offsets and heights are scaled so the strips tile the
+    original image exactly
+
+    :param image: (rows, columns) array, e.g. packed RGBA uint32
+    :returns: list of data dicts with image, x, y, dw and dh columns
+    """
+    rows = len(image)
+    def take(start, stop):
+        return {
+            "image": [image[start:stop]],
+            "x": [x],
+            "y": [y + dh * start / rows],
+            "dw": [dw],
+            "dh": [dh * (stop - start) / rows]}
+    return [chunk for _, _, chunk in split(take, 0, rows, budget)]
+
+
+def empty_image():
+    """Data for an image_rgba source to stream image_strips() into"""
+    return {"image": [], "x": [], "y": [], "dw": [], "dh": []}
+
+
+def patch_chunks(name, index, array, budget=BUDGET):
+    """Split an update of an n-d column item into payloads for source.patch()
+
+    :param name: column holding NumPy arrays, e.g. "image"
+    :param index: row of the column to overwrite
+    :param array: replacement values, same shape as the existing item
+    """
+    tail = (slice(None),) * (array.ndim - 1)
+    def take(start, stop):
+        region = (index, slice(start, stop)) + tail
+        return {name: [(region, array[start:stop].ravel())]}
+    return [chunk for _, _, chunk in split(take, 0, len(array), budget)]
+
+
+def split(take, start, stop, budget):
+    """Recursively divide [start, stop) until take(start, stop) fits budget
+
+    :param take: function returning the payload of a range of rows
+    :returns: list of (start, stop, payload) tuples in order
+    """
+    payload = take(start, stop)
+    size = measure(payload)
+    if (size <= budget) or (stop - start == 1):
+        return [(start, stop, payload)]
+    pieces = min(math.ceil(size / budget), stop - start)
+    bounds = [start + (stop - start) * i // pieces for i in range(pieces + 1)]
+    result = []
+    for lower, upper in zip(bounds[:-1], bounds[1:]):
+        result += split(take, lower, upper, budget)
+    return result
+
+
+class Transfer(object):
+    """Apply chunks to a source one per tick, reporting progress
+
+    Each chunk is applied in its own next tick callback so every
+    stream/patch event is sent as a separate message and the server
+    stays responsive between chunks
+
+    :param document: document owning source
+    :param source: ColumnDataSource to update
+    :param chunks: payloads from stream_chunks, image_strips or patch_chunks
+    :param method: "stream" or "patch"
+    :param progress: optional Div whose text shows chunks received
+    :param schedule: function to defer a callback, defaults to
+                     document.add_next_tick_callback
+    """
+    def __init__(self, document, source, chunks, method="stream",
+                 progress=None, schedule=None):
+        if method not in ("stream", "patch"):
+            raise ValueError("method must be 'stream' or 'patch'")
+        if schedule is None:
+            schedule = document.add_next_tick_callback
+        self.source = source
+        self.chunks = list(chunks)
+        self.method = method
+        self.progress = progress
+        self.schedule = schedule
+        self.sent = 0
+
+    @property
+    def done(self):
+        return self.sent >= len(self.chunks)
+
+    def start(self):
+        self.report()
+        if not self.done:
+            self.schedule(self.step)
+
+    def step(self):
+        getattr(self.source, self.method)(self.chunks[self.sent])
+        self.sent += 1
+        self.report()
+        if not self.done:
+            self.schedule(self.step)
+
+    def report(self):
+        if self.progress is None:
+            return
+        total = len(self.chunks)
+        percent = 100 * self.sent // total if total else 100
+        self.progress.text = "Received {} of {} chunks ({}%)".format(
+            self.sent, total, percent)
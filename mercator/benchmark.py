@@ -0,0 +1,38 @@
+"""Compare cartopy transform_points against closed form projection
+
+Usage: python benchmark.py
+"""
+import timeit
+import numpy as np
+import cartopy
+import projection
+
+
+def cartopy_web_mercator(lons, lats):
+    gl = cartopy.crs.Mercator.GOOGLE
+    pc = cartopy.crs.PlateCarree()
+    x, y, _ = gl.transform_points(pc, lons, lats).T
+    return x, y
+
+
+def best_of(func, *args, number=3, **kwargs):
+    return min(timeit.repeat(lambda: func(*args, **kwargs),
+                             number=1, repeat=number))
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6)):
+    print("{:>10} {:>12} {:>12} {:>12}".format(
+        "points", "cartopy (s)", "closed (s)", "in place (s)"))
+    for n in sizes:
+        lons = np.random.uniform(-180, 180, n)
+        lats = np.random.uniform(-85, 85, n)
+        out = np.empty(n), np.empty(n)
+        print("{:>10} {:12.6f} {:12.6f} {:12.6f}".format(
+            n,
+            best_of(cartopy_web_mercator, lons, lats),
+            best_of(projection.web_mercator, lons, lats),
+            best_of(projection.web_mercator, lons, lats, out=out)))
+
+
+if __name__ == '__main__':
+    benchmark()
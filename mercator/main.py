@@ -2,8 +2,7 @@ import bokeh.plotting
 import bokeh.models
 import bokeh.palettes
 import numpy as np
-import cartopy
-import scipy.interpolate
+import projection
 import stretch
 
 
@@ -25,9 +24,7 @@ def main():
     x2d, y2d = np.meshgrid(x, y)
 
     # Map to Google Mercator projection
-    gl = cartopy.crs.Mercator.GOOGLE
-    pc = cartopy.crs.PlateCarree()
-    xt1d, yt1d, _ = gl.transform_points(pc, x2d.flatten(), y2d.flatten()).T
+    xt1d, yt1d = projection.web_mercator(x2d.flatten(), y2d.flatten())
 
     zt1d = yt1d
 
@@ -145,6 +142,7 @@ def regular_grid(x, y, z):
     :returns: x, y, z mapped to regular grid with
               same shape as input arrays
     """
+    import scipy.interpolate  # Deferred, only needed without stretch
     if isinstance(z, list):
         z = np.asarray(z)
     ny, nx = x.shape
@@ -0,0 +1,59 @@
+"""Spherical Web Mercator projection
+
+Closed form equivalents of transforming between cartopy's
+PlateCarree and Mercator.GOOGLE without building CRS objects or
+N x 3 arrays. Results can be written into existing float64 buffers,
+including the input arrays themselves
+
+>>> x, y = web_mercator([0, 10], [0, 45])
+>>> lons, lats = plate_carree(x, y)
+
+Latitudes are clamped to the edge of the square web map, roughly
+85.0511 degrees, so the poles map to finite values
+"""
+import numpy as np
+
+
+RADIUS = 6378137.
+MAX_LATITUDE = np.degrees(2 * np.arctan(np.exp(np.pi)) - np.pi / 2)
+
+
+def web_mercator(lons, lats, out=None):
+    """Project longitudes/latitudes in degrees to Web Mercator metres
+
+    :param out: optional pair of float64 arrays to hold x and y,
+                may be lons and lats to project in place
+    :returns: x, y arrays
+    """
+    lons = np.asarray(lons, dtype=np.float64)
+    lats = np.asarray(lats, dtype=np.float64)
+    if out is None:
+        out = np.empty(lons.shape), np.empty(lats.shape)
+    x, y = out
+    np.multiply(lons, RADIUS * np.pi / 180, out=x)
+    np.clip(lats, -MAX_LATITUDE, MAX_LATITUDE, out=y)
+    np.radians(y, out=y)
+    np.sin(y, out=y)
+    np.arctanh(y, out=y)
+    y *= RADIUS
+    return x, y
+
+
+def plate_carree(x, y, out=None):
+    """Inverse of web_mercator, metres to longitudes/latitudes in degrees
+
+    :param out: optional pair of float64 arrays to hold lons and lats,
+                may be x and y to convert in place
+    :returns: lons, lats arrays
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if out is None:
+        out = np.empty(x.shape), np.empty(y.shape)
+    lons, lats = out
+    np.multiply(x, 180 / (np.pi * RADIUS), out=lons)
+    np.divide(y, RADIUS, out=lats)
+    np.tanh(lats, out=lats)
+    np.arcsin(lats, out=lats)
+    np.degrees(lats, out=lats)
+    return lons, lats
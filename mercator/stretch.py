@@ -1,40 +1,166 @@
-import cartopy
-import scipy.interpolate
-import scipy.ndimage
+import os
+import threading
+import contextlib
+from multiprocessing import shared_memory
 import numpy as np
+import projection
+
+
+PLANS = {}
+MAX_PLANS = 32
+SCRATCH = threading.local()
 
 
 def web_mercator_y(latitudes):
     """Find y values in Mercator Web projection related to latitudes"""
-    longitudes = np.zeros(len(latitudes), dtype=np.float)
-    gl = cartopy.crs.Mercator.GOOGLE
-    pc = cartopy.crs.PlateCarree()
-    _, y, _ = gl.transform_points(pc, longitudes, latitudes).T
+    longitudes = np.zeros(len(latitudes), dtype=np.float64)
+    _, y = projection.web_mercator(longitudes, latitudes)
     return y
 
 
-def stretch_transform(y, axis=1, dtype=np.float):
-    """Generate latitude/y stretching transform"""
-    index = np.arange(len(y), dtype=dtype)
-    index_map = scipy.interpolate.interp1d(y, index)
-    mapped_index = index_map(equal_spaced(y))
+def stretch_transform(y, axis=1, dtype=np.float64):
+    """Generate latitude/y stretching transform
+
+    Transforms are StretchPlan instances cached by grid, so forecast
+    steps sharing coordinates reuse the same indices and weights
+    """
+    y = np.asarray(y, dtype=np.float64)
+    key = (y.tobytes(), axis, np.dtype(dtype).str)
+    if key not in PLANS:
+        if len(PLANS) >= MAX_PLANS:
+            PLANS.pop(next(iter(PLANS)))
+        PLANS[key] = StretchPlan(y, axis=axis, dtype=dtype)
+    return PLANS[key]
+
+
+class StretchPlan(object):
+    """Linear stretch of one axis onto equally spaced coordinates
+
+    Source rows and blend weights are computed once, applying the
+    plan is then a gather of two neighbouring rows and a weighted
+    sum, equivalent to map_coordinates with order=1
+
+    >>> plan = StretchPlan(y, axis=0)
+    >>> plan(values)  # (ny, nx)
+    >>> plan(stack)   # (nt, ny, nx), stretched in a single call
+
+    :param y: monotonic coordinates along the stretched axis
+    :param axis: axis of a 2D field to stretch, leading axes of
+                 stacked fields are left alone
+    :param dtype: dtype of the weights and results
+    """
+    def __init__(self, y, axis=1, dtype=np.float64):
+        y = np.asarray(y, dtype=np.float64)
+        order = np.argsort(y)
+        index = np.interp(equal_spaced(y), y[order], order.astype(np.float64))
+        lower = np.clip(np.floor(index), 0, max(len(y) - 2, 0))
+        self.axis = axis
+        self.dtype = dtype
+        self.lower = lower.astype(np.int32)
+        self.upper = np.minimum(self.lower + 1, len(y) - 1).astype(np.int32)
+        self.weights = (index - lower).astype(dtype)
+
+    def __call__(self, values, out=None):
+        """Stretch values, optionally into a preallocated out array
+
+        Stacks are stretched one field at a time through scratch
+        buffers the size of a single field, reused by later calls
+        with the same field shape in the same thread
+        """
+        values = np.asarray(values)
+        assert values.ndim >= 2, 'Only able to stretch 2D arrays or stacks'
+        shape = [1, 1]
+        shape[self.axis] = len(self.weights)
+        weights = self.weights.reshape(shape)
+        if out is None:
+            out = np.empty(values.shape, dtype=self.dtype)
+        lower = scratch("lower", values.shape[-2:], values.dtype)
+        upper = scratch("upper", values.shape[-2:], values.dtype)
+        for index in np.ndindex(values.shape[:-2]):
+            field, result = values[index], out[index]
+            np.take(field, self.lower, axis=self.axis, out=lower, mode="clip")
+            np.take(field, self.upper, axis=self.axis, out=upper, mode="clip")
+            np.subtract(upper, lower, out=result, dtype=result.dtype,
+                        casting="unsafe")
+            result *= weights
+            result += lower
+        return out
+
+
+def scratch(name, shape, dtype):
+    """Per thread buffer re-allocated only when shape or dtype change"""
+    buffer = getattr(SCRATCH, name, None)
+    if (buffer is None) or (buffer.shape != shape) or (buffer.dtype != dtype):
+        buffer = np.empty(shape, dtype=dtype)
+        setattr(SCRATCH, name, buffer)
+    return buffer
+
+
+def stretch_batch(transform, values, executor=None, chunks=None):
+    """Stretch every field of an N-D stack, optionally on a process pool
+
+    Fields are copied once into shared memory, each worker stretches
+    a contiguous range of fields straight into a shared result so
+    no arrays are pickled between processes
+
+    >>> with concurrent.futures.ProcessPoolExecutor() as executor:
+    ...     result = stretch_batch(plan, cube, executor=executor)
+
+    :param transform: StretchPlan, e.g. from stretch_transform()
+    :param values: array shaped (..., ny, nx)
+    :param executor: ProcessPoolExecutor, stretch in this process if None
+    :param chunks: number of pieces, defaults to the number of cores
+    :returns: contiguous array shaped like values
+    """
+    values = np.ascontiguousarray(values)
+    if executor is None:
+        return transform(values)
+    fields = values.reshape((-1,) + values.shape[-2:])
+    if chunks is None:
+        chunks = os.cpu_count() or 1
+    bounds = np.linspace(0, len(fields), min(chunks, len(fields)) + 1)
+    bounds = bounds.astype(int)
+    with shared_array(fields.shape, fields.dtype) as (source, source_array), \
+            shared_array(fields.shape, transform.dtype) as (result, result_array):
+        source_array[...] = fields
+        futures = [
+            executor.submit(
+                stretch_shared, transform,
+                (source.name, fields.shape, fields.dtype.str),
+                (result.name, fields.shape, np.dtype(transform.dtype).str),
+                start, stop)
+            for start, stop in zip(bounds[:-1], bounds[1:])]
+        for future in futures:
+            future.result()
+        return result_array.reshape(values.shape).copy()
+
+
+def stretch_shared(transform, source, result, start, stop):
+    """Worker side of stretch_batch, source and result name shared arrays"""
+    with attach(*source) as values, attach(*result) as out:
+        transform(values[start:stop], out=out[start:stop])
+
+
+@contextlib.contextmanager
+def shared_array(shape, dtype):
+    """Shared memory block and an array view of it, freed on exit"""
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        yield memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+    finally:
+        memory.close()
+        memory.unlink()
 
-    def transform(values):
-        if isinstance(values, list):
-            values = np.asarray(values)
-        assert values.ndim == 2, 'Only able to stretch 2D arrays'
-        if axis == 1:
-            i = np.arange(values.shape[0], dtype=dtype)
-            j = mapped_index
-        else:
-            i = mapped_index
-            j = np.arange(values.shape[1], dtype=dtype)
-        return scipy.ndimage.map_coordinates(values,
-                                             np.meshgrid(i, j, indexing='ij'),
-                                             order=1)
 
-    return transform
+@contextlib.contextmanager
+def attach(name, shape, dtype):
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        yield np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+    finally:
+        memory.close()
 
 
 def equal_spaced(v):
-    return np.linspace(v.min(), v.max(), len(v), dtype=np.float)
+    return np.linspace(v.min(), v.max(), len(v), dtype=np.float64)
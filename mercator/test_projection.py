@@ -0,0 +1,47 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import numpy as np
+import cartopy
+import projection
+
+
+class TestProjection(unittest.TestCase):
+    def setUp(self):
+        lons, lats = np.meshgrid(
+            np.linspace(-180, 180, 37),
+            np.linspace(-85, 85, 35))
+        self.lons, self.lats = lons.flatten(), lats.flatten()
+
+    def test_web_mercator_matches_cartopy(self):
+        gl = cartopy.crs.Mercator.GOOGLE
+        pc = cartopy.crs.PlateCarree()
+        ex, ey, _ = gl.transform_points(pc, self.lons, self.lats).T
+        rx, ry = projection.web_mercator(self.lons, self.lats)
+        np.testing.assert_allclose(ex, rx, atol=1e-6)
+        np.testing.assert_allclose(ey, ry, atol=1e-6)
+
+    def test_plate_carree_matches_cartopy(self):
+        gl = cartopy.crs.Mercator.GOOGLE
+        pc = cartopy.crs.PlateCarree()
+        x, y, _ = gl.transform_points(pc, self.lons, self.lats).T
+        elons, elats, _ = pc.transform_points(gl, x, y).T
+        rlons, rlats = projection.plate_carree(x, y)
+        np.testing.assert_allclose(elons, rlons, atol=1e-9)
+        np.testing.assert_allclose(elats, rlats, atol=1e-9)
+
+    def test_round_trip_in_place(self):
+        x, y = self.lons.copy(), self.lats.copy()
+        rx, ry = projection.web_mercator(x, y, out=(x, y))
+        self.assertIs(rx, x)
+        projection.plate_carree(x, y, out=(x, y))
+        np.testing.assert_allclose(self.lons, x, atol=1e-9)
+        np.testing.assert_allclose(self.lats, y, atol=1e-9)
+
+    def test_poles_are_clamped(self):
+        _, y = projection.web_mercator([0, 0], [90, -90])
+        np.testing.assert_allclose(y, [20037508.34, -20037508.34])
+
+    def test_given_lists(self):
+        x, y = projection.web_mercator([0], [0])
+        np.testing.assert_array_equal(x, [0])
+        np.testing.assert_array_equal(y, [0])
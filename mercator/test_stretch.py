@@ -1,7 +1,10 @@
 # pylint: disable=missing-docstring, invalid-name
 import unittest
+import concurrent.futures
 import scipy.ndimage
+import scipy.interpolate
 import numpy as np
+import stretch
 
 
 class TestMapCoordinates(unittest.TestCase):
@@ -76,3 +79,77 @@ class TestMeshgrid(unittest.TestCase):
         ]
         np.testing.assert_array_almost_equal(expect_i, result_i)
         np.testing.assert_array_almost_equal(expect_j, result_j)
+
+
+def map_coordinates_stretch(values, y, axis):
+    """Reference implementation using scipy interp1d and map_coordinates"""
+    index = np.arange(len(y), dtype=np.float64)
+    mapped = scipy.interpolate.interp1d(y, index)(stretch.equal_spaced(y))
+    if axis == 1:
+        i, j = np.arange(values.shape[0], dtype=np.float64), mapped
+    else:
+        i, j = mapped, np.arange(values.shape[1], dtype=np.float64)
+    return scipy.ndimage.map_coordinates(
+        values, np.meshgrid(i, j, indexing="ij"), order=1)
+
+
+class TestStretchPlan(unittest.TestCase):
+    def setUp(self):
+        self.y = stretch.web_mercator_y(np.linspace(-70, 70, 50))
+        self.values = np.random.RandomState(0).rand(50, 40)
+
+    def test_plan_matches_map_coordinates_given_axis_0(self):
+        plan = stretch.StretchPlan(self.y, axis=0)
+        expect = map_coordinates_stretch(self.values, self.y, axis=0)
+        np.testing.assert_array_almost_equal(expect, plan(self.values))
+
+    def test_plan_matches_map_coordinates_given_axis_1(self):
+        values = self.values.T
+        plan = stretch.StretchPlan(self.y, axis=1)
+        expect = map_coordinates_stretch(values, self.y, axis=1)
+        np.testing.assert_array_almost_equal(expect, plan(values))
+
+    def test_plan_given_stack_of_fields(self):
+        stack = np.stack([self.values, 2 * self.values, self.values ** 2])
+        plan = stretch.StretchPlan(self.y, axis=0)
+        result = plan(stack)
+        for field, stretched in zip(stack, result):
+            np.testing.assert_array_almost_equal(plan(field), stretched)
+
+    def test_plan_given_decreasing_coordinates(self):
+        plan = stretch.StretchPlan(self.y[::-1], axis=0)
+        expect = map_coordinates_stretch(self.values, self.y[::-1], axis=0)
+        np.testing.assert_array_almost_equal(expect, plan(self.values))
+
+    def test_stretch_transform_reuses_plan(self):
+        first = stretch.stretch_transform(self.y, axis=0)
+        second = stretch.stretch_transform(self.y.copy(), axis=0)
+        self.assertIs(first, second)
+
+
+class TestStretchBatch(unittest.TestCase):
+    def setUp(self):
+        y = stretch.web_mercator_y(np.linspace(-70, 70, 50))
+        self.plan = stretch.StretchPlan(y, axis=0)
+        self.cube = np.random.RandomState(0).rand(3, 4, 50, 40)
+
+    def test_stretch_batch_in_process(self):
+        result = stretch.stretch_batch(self.plan, self.cube)
+        np.testing.assert_array_equal(self.plan(self.cube), result)
+
+    def test_stretch_batch_given_process_pool(self):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            result = stretch.stretch_batch(
+                self.plan, self.cube, executor=executor, chunks=5)
+        self.assertTrue(result.flags.c_contiguous)
+        np.testing.assert_array_almost_equal(self.plan(self.cube), result)
+
+    def test_scratch_buffers_reused(self):
+        self.plan(self.cube)
+        first = stretch.SCRATCH.upper
+        self.plan(2 * self.cube)
+        self.assertIs(first, stretch.SCRATCH.upper)
+
+    def test_scratch_buffers_hold_one_field(self):
+        self.plan(self.cube)
+        self.assertEqual(stretch.SCRATCH.upper.shape, self.cube.shape[-2:])
@@ -1,10 +1,15 @@
 import bokeh.plotting
 import bokeh.models
 import bokeh.layouts
-import cartopy
 import numpy as np
-import datetime as dt
-from functools import partial
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "mercator"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "chronometer"))
+import projection
+import rx
 
 
 def main():
@@ -147,44 +152,24 @@ def main():
 
 
 def debounce(f, miliseconds=200):
+    """Call f with the latest (attr, old, new) once changes pause"""
     document = bokeh.plotting.curdoc()
-    timeout_callback = None
-    def wrapper(attr, old, new):
-        nonlocal document
-        nonlocal timeout_callback
-        callback = partial(f, attr, old, new)
-        if timeout_callback is not None:
-            try:
-                document.remove_timeout_callback(timeout_callback)
-            except ValueError:
-                pass
-        timeout_callback = document.add_timeout_callback(
-                callback,
-                miliseconds)
-    return wrapper
+    return limit(f, lambda stream: stream.debounce(miliseconds, document))
 
 
 def throttle(f, seconds=1):
-    miliseconds = 1000 * seconds
-    last_time = None
+    """Call f with the latest (attr, old, new) at most once per period"""
     document = bokeh.plotting.curdoc()
-    timeout_callback = None
+    return limit(f, lambda stream: stream.throttle(
+        1000 * seconds, document, leading=False))
+
+
+def limit(f, operator):
+    """Route on_change callbacks through an rx operator before f"""
+    stream = rx.Stream()
+    operator(stream).subscribe(lambda args: f(*args))
     def wrapper(attr, old, new):
-        nonlocal document
-        nonlocal timeout_callback
-        nonlocal last_time
-        now = dt.datetime.now()
-        callback = partial(f, attr, old, new)
-        if (last_time is None) or ((now - last_time).total_seconds() > seconds):
-            last_time = now
-            if timeout_callback is not None:
-                try:
-                    document.remove_timeout_callback(timeout_callback)
-                except ValueError:
-                    pass
-            timeout_callback = document.add_timeout_callback(
-                    callback,
-                    miliseconds)
+        stream.emit((attr, old, new))
     return wrapper
 
 
@@ -216,17 +201,11 @@ class Picker(object):
 
 
 def google_mercator(lons, lats):
-    gl = cartopy.crs.Mercator.GOOGLE
-    pc = cartopy.crs.PlateCarree()
-    x, y, _ = gl.transform_points(pc, flatten(lons), flatten(lats)).T
-    return x, y
+    return projection.web_mercator(flatten(lons), flatten(lats))
 
 
 def plate_carree(x, y):
-    gl = cartopy.crs.Mercator.GOOGLE
-    pc = cartopy.crs.PlateCarree()
-    lons, lats, _ = pc.transform_points(gl, flatten(x), flatten(y)).T
-    return lons, lats
+    return projection.plate_carree(flatten(x), flatten(y))
 
 
 def flatten(a):
@@ -1,132 +1,13 @@
+import os
+import sys
 import bokeh.plotting
 import bokeh.models
 import datetime as dt
 from functools import partial
-
-
-class Observer(object):
-    def __init__(self, method):
-        self.method = method
-
-    def notify(self, value):
-        return self.method(value)
-
-
-class Stream(object):
-    def __init__(self):
-        self.subscribers = []
-
-    def register(self, subscriber):
-        self.subscribers.append(subscriber)
-
-    def subscribe(self, method):
-        self.subscribers.append(Observer(method))
-
-    def emit(self, value):
-        for subscriber in self.subscribers:
-            subscriber.notify(value)
-
-    def map(self, transform):
-        return Map(self, transform)
-
-    def scan(self, initial, combine):
-        return Scan(self, initial, combine)
-
-    def filter(self, criteria):
-        return Filter(self, criteria)
-
-    def unique(self):
-        return Unique(self)
-
-    def log(self):
-        return Log(self)
-
-
-class Log(Stream):
-    def __init__(self, stream):
-        stream.register(self)
-        super().__init__()
-
-    def notify(self, value):
-        print(value)
-        self.emit(value)
-
-
-class Combine(Stream):
-    def __init__(self, *streams):
-        for stream in streams:
-            stream.register(self)
-        super().__init__()
-
-    def notify(self, value):
-        self.emit(value)
-
-
-class CombineLatest(Stream):
-    def __init__(self, *streams):
-        self.state = []
-        def indexed_calls(i):
-            def wrapped(x):
-                return (i, x)
-            return wrapped
-        for i, stream in enumerate(streams):
-            stream.map(indexed_calls(i)).register(self)
-            self.state.append(None)
-        super().__init__()
-
-    def notify(self, indexed_value):
-        index, value = indexed_value
-        state = list(self.state)
-        state[index] = value
-        self.state = tuple(state)
-        self.emit(self.state)
-
-
-class Map(Stream):
-    def __init__(self, stream, transform):
-        stream.register(self)
-        self.transform = transform
-        super().__init__()
-
-    def notify(self, value):
-        self.emit(self.transform(value))
-
-
-class Scan(Stream):
-    def __init__(self, stream, initial, combine):
-        self.state = initial
-        self.combine = combine
-        stream.register(self)
-        super().__init__()
-
-    def notify(self, value):
-        self.state = self.combine(self.state, value)
-        self.emit(self.state)
-
-
-class Filter(Stream):
-    def __init__(self, stream, criteria):
-        self.criteria = criteria
-        stream.register(self)
-        super().__init__()
-
-    def notify(self, value):
-        if not self.criteria(value):
-            self.emit(value)
-
-
-class Unique(Stream):
-    def __init__(self, stream):
-        stream.register(self)
-        super().__init__()
-
-    def notify(self, value):
-        if not hasattr(self, 'current'):
-            self.current = value
-            self.emit(value)
-        elif value != self.current:
-            self.current = value
-            self.emit(value)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "chronometer"))
+import rx
+from rx import Stream
 
 
 def to_text(number):
@@ -162,11 +43,11 @@ def render(widget, value):
 
 
 def combine(*streams):
-    return Combine(*streams)
+    return rx.merge(*streams)
 
 
 def combine_latest(*streams):
-    return CombineLatest(*streams)
+    return rx.combine_latest(*streams)
 
 
 def title(run_time, hours):
@@ -204,7 +85,8 @@ def main():
     # Functional reactive programming style UI
     stream = Stream()
     time_clicks = stream
-    index = stream.scan(0, partial(bounded_sum, 0, len(times))).unique()
+    index = stream.scan(0, partial(bounded_sum, 0, len(times)))
+    index = index.distinct_until_changed()
     labels = index.map(to_text)
     labels.subscribe(partial(render, time_index_p))
     time_stream = index.map(partial(list.__getitem__, times))
@@ -214,17 +96,18 @@ def main():
 
     stream = Stream()
     hour_clicks = stream
-    index = stream.scan(0, partial(bounded_sum, 0, len(hours))).unique()
+    index = stream.scan(0, partial(bounded_sum, 0, len(hours)))
+    index = index.distinct_until_changed()
     index.map(to_text).subscribe(partial(render, hours_index_p))
     hour_stream = index.map(partial(list.__getitem__, hours))
     hour_stream.map(str).subscribe(partial(render, hours_p))
     buttons.append([plus_button(stream),
                     minus_button(stream)])
 
-    def any_none(items):
-        return any([item is None for item in items])
+    def all_not_none(items):
+        return all(item is not None for item in items)
     stream = combine_latest(time_stream, hour_stream)
-    stream = stream.filter(any_none)
+    stream = stream.filter(all_not_none)
     titles = stream.map(lambda args: title(*args))
     titles.subscribe(partial(render, title_p))
 
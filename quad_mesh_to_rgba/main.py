@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
+import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
 import bokeh.io
 import bokeh.plotting
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, os.path.join(
+    os.path.dirname(__file__), os.pardir, "slippy_map", "tiling"))
+import assets
+import diff
+import pyramid
+import ranges
 
 
 def main(bokeh_id):
@@ -10,8 +19,57 @@ def main(bokeh_id):
     figure = bokeh.plotting.figure(sizing_mode="stretch_both",
                                    match_aspect=True)
 
-    # Numpy/iris.Cube domain
     ni, nj = 1000, 1000
+    rgba = assets.get(("quad_mesh", ni, nj), lambda: quad_mesh_rgba(ni, nj))
+
+    if bokeh_id == '__main__':
+        # Bokeh domain
+        source = bokeh.models.ColumnDataSource({
+            "image": [rgba]
+        })
+        figure.image_rgba(x=0,
+                          y=0,
+                          dw=nj,
+                          dh=ni,
+                          image="image",
+                          source=source)
+        bokeh.plotting.show(figure)
+    else:
+        # Served sessions only receive the pyramid tiles in view
+        image = assets.get(
+            ("quad_mesh_pyramid", ni, nj),
+            lambda: pyramid.Pyramid(rgba, dw=nj, dh=ni, dataset="quad_mesh"))
+        document = bokeh.io.curdoc()
+        tiled(figure, image, document)
+        document.add_root(figure)
+
+
+def tiled(figure, image, document):
+    """Draw a pyramid.Pyramid, sending tiles as the viewport changes"""
+    source = bokeh.models.ColumnDataSource(image.render([]))
+    layer = diff.TileLayer(source, image.render)
+    layer.update(image.keys(
+        image.x, image.x + image.dw,
+        image.y, image.y + image.dh,
+        ranges.SCREEN_WIDTH))
+
+    def on_viewport(x_start, x_end, y_start, y_end):
+        layer.update(image.keys(
+            x_start, x_end, y_start, y_end, ranges.screen_width(figure)))
+
+    ranges.on_change(figure, document, on_viewport)
+    figure.image_rgba(x="x",
+                      y="y",
+                      dw="dw",
+                      dh="dh",
+                      image="image",
+                      source=source)
+    return layer
+
+
+def quad_mesh_rgba(ni, nj):
+    """RGBA pixels of a pcolormesh, the same for every session"""
+    # Numpy/iris.Cube domain
     values = np.arange(ni*nj).reshape(ni, nj)
 
     # Matplotlib domain
@@ -19,24 +77,8 @@ def main(bokeh_id):
     plt.savefig("quad_mesh.png")
 
     # Matplotlib to Bokeh
-    rgba = quad_mesh.to_rgba(quad_mesh.get_array(),
+    return quad_mesh.to_rgba(quad_mesh.get_array(),
                              bytes=True).reshape((ni, nj, 4))
 
-    # Bokeh domain
-    source = bokeh.models.ColumnDataSource({
-        "image": [rgba]
-    })
-    figure.image_rgba(x=0,
-                      y=0,
-                      dw=nj,
-                      dh=ni,
-                      image="image",
-                      source=source)
-
-    if bokeh_id == '__main__':
-        bokeh.plotting.show(figure)
-    else:
-        bokeh.io.curdoc().add_root(figure)
-
 
 main(__name__)
@@ -1,5 +1,10 @@
+import os
+import sys
 import numpy as np
 import bokeh.plotting
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "chronometer"))
+import rx
 
 
 def perimeter(x, y, dw, dh):
@@ -14,21 +19,24 @@ def area(x_start, x_end, y_start, y_end):
 
 
 def valid_range(figure):
-    return all(value is not None for value in [
+    """True once ranges are known, Bokeh 3 starts them at NaN"""
+    extent = [
         figure.x_range.start,
         figure.x_range.end,
         figure.y_range.start,
         figure.y_range.end
-    ])
+    ]
+    if any(value is None for value in extent):
+        return False
+    return bool(np.all(np.isfinite(extent)))
+
+
+COLORS = ["blue", "red", "purple", "green", "orange", "teal"]
 
 
 def color(dw):
-    if dw == 1:
-        return "blue"
-    elif dw == 0.5:
-        return "red"
-    elif dw == 0.25:
-        return "purple"
+    level = int(round(-np.log2(dw)))
+    return COLORS[level % len(COLORS)]
 
 
 source = bokeh.models.ColumnDataSource({
@@ -56,43 +64,65 @@ def draw_squares(figure):
         }
 
 
-def tiles(x_start, x_end, y_start, y_end):
-    if area(x_start, x_end, y_start, y_end) < 4 * (0.25)**2:
-        dw, dh = 0.25, 0.25
-        if x_start < 0:
-            x0 = 0
-        else:
-            x0 = np.floor(x_start / dw) * dw
-        if y_start < 0:
-            y0 = 0
-        else:
-            y0 = np.floor(y_start / dh) * dh
-        x = dw * np.array([0, 1, 1, 0], dtype="f") + x0
-        y = dh * np.array([0, 0, 1, 1], dtype="f") + y0
-        xys = zip(x, y)
-    elif area(x_start, x_end, y_start, y_end) < 4 * (0.5)**2:
-        xys = [(0, 0), (0.5, 0.), (0.5, 0.5), (0, 0.5)]
-        dw, dh = 0.5, 0.5
-    else:
-        xys = [(0, 0)]
-        dw, dh = 1, 1
-    tiles = []
-    for x, y in xys:
-        tiles.append((x, y, dw, dh))
-    return tiles
-
-
-def add_zoom(figure):
-    counter = 0
+def zoom_level(map_area, screen_area, max_level=24):
+    """Level at which a tile is no smaller than the visible area
+
+    Each level splits a tile into four, so the level grows with the
+    base 4 logarithm of the map to screen area ratio, a screen with
+    no area is infinitely zoomed in and gets max_level
+    """
+    if screen_area <= 0:
+        return max_level
+    if screen_area >= map_area:
+        return 0
+    return min(int(np.floor(np.log(map_area / screen_area) / np.log(4))),
+               max_level)
+
+
+def tiles(x_start, x_end, y_start, y_end, map_width=1, map_height=1):
+    """Tiles covering a viewport at the level matching its area
+
+    Flipped extents are put in order, a viewport with no area is
+    sized by its longer side
+
+    :returns: list of x, y, dw, dh tuples, empty if the viewport is
+              not finite or misses the map
+    """
+    if not np.all(np.isfinite([x_start, x_end, y_start, y_end])):
+        return []
+    x_start, x_end = sorted([x_start, x_end])
+    y_start, y_end = sorted([y_start, y_end])
+    if (x_end < 0) or (x_start > map_width):
+        return []
+    if (y_end < 0) or (y_start > map_height):
+        return []
+    screen_area = area(x_start, x_end, y_start, y_end)
+    if screen_area == 0:
+        screen_area = max(x_end - x_start, y_end - y_start) ** 2
+    level = zoom_level(map_width * map_height, screen_area)
+    n = 2 ** level
+    dw, dh = map_width / n, map_height / n
+    si = int(np.clip(np.floor(x_start / dw), 0, n - 1))
+    sj = int(np.clip(np.floor(y_start / dh), 0, n - 1))
+    ei = int(np.clip(np.ceil(x_end / dw) - 1, si, n - 1))
+    ej = int(np.clip(np.ceil(y_end / dh) - 1, sj, n - 1))
+    return [(i * dw, j * dh, dw, dh)
+            for i in range(si, ei + 1)
+            for j in range(sj, ej + 1)]
+
+
+def add_zoom(figure, document, milliseconds=100):
+    """Redraw at most once per period while ranges change"""
+    ranges = rx.Stream()
+    ranges.throttle(milliseconds, document, leading=False).subscribe(
+        lambda _: draw_squares(figure))
     def callback(attr, old, new):
-        nonlocal counter
-        if counter % 50 == 0:
-            draw_squares(figure)
-        counter += 1
+        ranges.emit(new)
     figure.x_range.on_change("start", callback)
     figure.x_range.on_change("end", callback)
     figure.y_range.on_change("start", callback)
     figure.y_range.on_change("end", callback)
+    return ranges
 
 
 figure = bokeh.plotting.figure(
@@ -101,6 +131,6 @@ figure = bokeh.plotting.figure(
         active_scroll="wheel_zoom",
         sizing_mode="stretch_both")
 figure.multi_line(xs="xs", ys="ys", color="color", source=source)
-add_zoom(figure)
 document = bokeh.plotting.curdoc()
+add_zoom(figure, document)
 document.add_root(figure)
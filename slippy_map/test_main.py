@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock
 import main
 import math
 
@@ -66,3 +67,69 @@ class TestTiles(unittest.TestCase):
         result = area(x_start, x_end, y_start, y_end)
         expect = 1
         self.assertEqual(expect, result)
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    def test_zoom_level_matches_sketch(self):
+        for screen_area in [1, 0.25, 1/10, 1/16, 1/1000]:
+            self.assertEqual(main.zoom_level(1, screen_area),
+                             zoom_level(1, screen_area))
+
+    def test_tiles_given_whole_map(self):
+        result = main.tiles(0, 1, 0, 1)
+        self.assertEqual(result, [(0, 0, 1, 1)])
+
+    def test_tiles_given_quarter_of_map(self):
+        result = main.tiles(0.25, 0.75, 0.25, 0.75)
+        expect = [
+            (0, 0, 0.5, 0.5),
+            (0, 0.5, 0.5, 0.5),
+            (0.5, 0, 0.5, 0.5),
+            (0.5, 0.5, 0.5, 0.5)]
+        self.assertEqual(expect, result)
+
+    def test_tiles_given_deep_zoom(self):
+        x, y, dw, dh = main.tiles(0.5, 0.5 + 1e-6, 0.5, 0.5 + 1e-6)[0]
+        self.assertEqual(dw, 2**-19)
+        self.assertEqual(x, 0.5)
+
+    def test_tiles_given_zero_height(self):
+        self.assertEqual(main.tiles(0, 1, 0, 0.0), [(0, 0, 1, 1)])
+
+    def test_tiles_given_point(self):
+        x, y, dw, dh = main.tiles(0.5, 0.5, 0.5, 0.5)[0]
+        self.assertEqual(dw, 2**-24)
+
+    def test_tiles_given_flipped_range(self):
+        self.assertEqual(main.tiles(0, 1, 1, 0), main.tiles(0, 1, 0, 1))
+
+    def test_tiles_given_nan(self):
+        self.assertEqual(main.tiles(0, 1, float("nan"), 1), [])
+
+    def test_tiles_given_viewport_off_map(self):
+        self.assertEqual(main.tiles(5, 6, 5, 6), [])
+
+    def test_zoom_level_given_no_screen_area(self):
+        self.assertEqual(main.zoom_level(1, 0), 24)
+
+    def test_valid_range_given_nan(self):
+        figure = main.bokeh.plotting.figure(x_range=(0, 1), y_range=(0, 1))
+        figure.x_range.start = float("nan")
+        self.assertFalse(main.valid_range(figure))
+
+    def test_color_given_any_level(self):
+        self.assertEqual(main.color(1), "blue")
+        self.assertEqual(main.color(2**-10), main.COLORS[10 % 6])
+
+
+class TestAddZoom(unittest.TestCase):
+    def test_add_zoom_coalesces_events(self):
+        scheduler = main.rx.VirtualScheduler()
+        figure = main.bokeh.plotting.figure(x_range=(0, 1), y_range=(0, 1))
+        main.add_zoom(figure, scheduler, milliseconds=50)
+        with unittest.mock.patch("main.draw_squares") as draw_squares:
+            for i in range(50):
+                figure.x_range.end = 1 - i / 100
+            draw_squares.assert_not_called()
+            scheduler.advance(50)
+            draw_squares.assert_called_once_with(figure)
@@ -0,0 +1,47 @@
+"""Compare per-tile loop against batched tile_grid
+
+Usage: python benchmark.py
+"""
+import timeit
+import main
+
+
+MAX_TILES = 512
+
+
+def loop_grid(level, start, end):
+    xs, ys = [], []
+    for i, j in main.tile_indices(start, end):
+        xc, yc, length = main.tile(i, j, level)
+        x, y = main.square(xc, yc, length)
+        xs.append(x)
+        ys.append(y)
+    return xs, ys
+
+
+def batched_grid(level, start, end):
+    x, y, offsets = main.tile_grid(level, start, end)
+    return main.nan_separated(x, offsets), main.nan_separated(y, offsets)
+
+
+def best_of(func, *args, number=3):
+    return min(timeit.repeat(lambda: func(*args), number=1, repeat=number))
+
+
+def benchmark(max_level=12, max_loop_level=8):
+    """Full grid until MAX_TILES per side then a fixed index window"""
+    print("{:>5} {:>10} {:>12} {:>12}".format(
+        "level", "tiles", "loop (s)", "batched (s)"))
+    for level in range(max_level + 1):
+        n = min(2 ** level, MAX_TILES)
+        start, end = (0, 0), (n - 1, n - 1)
+        if level <= max_loop_level:
+            loop = "{:12.6f}".format(best_of(loop_grid, level, start, end))
+        else:
+            loop = "{:>12}".format("-")
+        batched = best_of(batched_grid, level, start, end)
+        print("{:>5} {:>10} {} {:12.6f}".format(level, n * n, loop, batched))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,161 @@
+"""Tile caches
+
+Modules imported by a bokeh app are only executed once per server
+process, so the cache returned by shared() outlives sessions and is
+visible to every document. Tiles computed for one browser tab are
+then served from memory to the next
+
+Set TILE_CACHE_BYTES to change the memory budget and TILE_CACHE_DIR
+to also write every tile to a second tier on local disk, tiles
+evicted from memory are then read back from there
+"""
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+SHARED = None
+SHARED_LOCK = threading.Lock()
+
+
+def shared():
+    """Process wide tile cache keyed by (dataset, level, i, j, style)"""
+    global SHARED
+    with SHARED_LOCK:
+        if SHARED is None:
+            memory = LRUCache(max_bytes=int(
+                os.environ.get("TILE_CACHE_BYTES", 256 * 2**20)))
+            directory = os.environ.get("TILE_CACHE_DIR")
+            if directory is None:
+                SHARED = memory
+            else:
+                SHARED = TieredCache(memory, DiskCache(directory))
+        return SHARED
+
+
+class LRUCache(object):
+    """Evicts least recently used items once nbytes exceeds max_bytes
+
+    Items are expected to be NumPy arrays or anything else with
+    an nbytes attribute. Access is guarded by a lock so background
+    threads may fill the cache while the event loop reads it
+
+    :param max_bytes: memory budget in bytes
+    """
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "items": len(self.items),
+            "nbytes": self.nbytes
+        }
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def set(self, key, value):
+        with self.lock:
+            if key in self.items:
+                self.nbytes -= self.items.pop(key).nbytes
+            self.items[key] = value
+            self.nbytes += value.nbytes
+            while (self.nbytes > self.max_bytes) and (len(self.items) > 1):
+                _, evicted = self.items.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+
+class DiskCache(object):
+    """Arrays saved as .npy files named by a hash of their key
+
+    Files are read back memory mapped, writes go through a temporary
+    file so concurrent processes never read a partial array
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".npy")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def get(self, key, default=None):
+        path = self.path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return np.load(path, mmap_mode="r")
+
+    def set(self, key, value):
+        path = self.path(key)
+        # Unique temporary file, threads share a process id
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as stream:
+            np.save(stream, value)
+        os.replace(tmp, path)
+
+
+class TieredCache(object):
+    """Memory cache in front of a slower second tier
+
+    Second tier hits are promoted to memory, new items are written
+    to both tiers
+    """
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def __contains__(self, key):
+        return (key in self.memory) or (key in self.disk)
+
+    def stats(self):
+        return {"memory": self.memory.stats(), "disk": self.disk.stats()}
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value = self.disk.get(key)
+        if value is None:
+            return default
+        value = np.asarray(value)
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        self.disk.set(key, value)
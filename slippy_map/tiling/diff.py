@@ -0,0 +1,95 @@
+"""Incremental tile updates
+
+Keeps a ColumnDataSource with one row per tile in step with the set
+of tiles that should be displayed. Rather than replacing source.data
+the differences are sent as patch/stream events so only tiles that
+enter or leave the view travel over the websocket
+"""
+
+
+def diff(current, keys):
+    """Tiles that entered and exited between two collections of keys"""
+    current, keys = set(current), list(keys)
+    new = set(keys)
+    entered = [key for key in keys if key not in current]
+    exited = current - new
+    return entered, exited
+
+
+class TileLayer(object):
+    """One row per tile key, e.g. (i, j, level), in a ColumnDataSource
+
+    >>> layer = TileLayer(source, render)
+    >>> layer.update([(0, 0, 1), (0, 1, 1)])
+
+    :param source: ColumnDataSource to keep up to date
+    :param render: function mapping a list of keys to a dict of
+                   columns with one row per key
+    """
+    def __init__(self, source, render):
+        self.source = source
+        self.render = render
+        self.keys = []
+        self.rows = {}
+
+    def update(self, keys):
+        entered, exited = diff(self.keys, keys)
+        if len(exited) == len(self.keys):
+            self.reset(entered)
+            return
+        holes = sorted(self.rows[key] for key in exited)
+        for key in exited:
+            del self.rows[key]
+
+        # Re-use rows of exited tiles for entered tiles
+        n = min(len(holes), len(entered))
+        if n > 0:
+            self.patch(holes[:n], self.render(entered[:n]), entered[:n])
+        holes, entered = holes[n:], entered[n:]
+
+        if len(entered) > 0:
+            self.stream(entered)
+        if len(holes) > 0:
+            self.compact(holes)
+
+    def reset(self, keys):
+        self.source.data = self.render(keys)
+        self.keys = list(keys)
+        self.rows = {key: i for i, key in enumerate(self.keys)}
+
+    def patch(self, indices, data, keys):
+        self.source.patch({
+            name: list(zip(indices, values))
+            for name, values in data.items()})
+        for index, key in zip(indices, keys):
+            self.keys[index] = key
+            self.rows[key] = index
+
+    def stream(self, keys):
+        self.source.stream(self.render(keys))
+        for key in keys:
+            self.rows[key] = len(self.keys)
+            self.keys.append(key)
+
+    def compact(self, holes):
+        """Drop unused rows by moving leading rows into holes
+
+        Streaming with rollover discards rows from the front, so
+        surviving rows in front of the cut are patched into holes
+        behind it before the rollover is applied
+        """
+        k = len(holes)
+        front = set(holes) & set(range(k))
+        survivors = [i for i in range(k) if i not in front]
+        targets = [i for i in holes if i >= k]
+        if len(survivors) > 0:
+            data = {
+                name: [values[i] for i in survivors]
+                for name, values in self.source.data.items()}
+            keys = [self.keys[i] for i in survivors]
+            self.patch(targets, data, keys)
+        self.source.stream(
+            {name: [] for name in self.source.data.keys()},
+            rollover=len(self.keys) - k)
+        self.keys = self.keys[k:]
+        self.rows = {key: i for i, key in enumerate(self.keys)}
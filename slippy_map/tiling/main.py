@@ -1,20 +1,18 @@
+import os
+import tempfile
 import bokeh.plotting
 import bokeh.layouts
 import numpy as np
+import diff
+import prefetch
+import pyramid
+import ranges
+import store
 
 
 EARTH_CIRCUMFERENCE = 2 * np.pi * 6378137
-
-
-def axis_listener(figure):
-    def wrapper(attr, old, new):
-        print(
-            figure.x_range.start,
-            figure.x_range.end,
-            figure.y_range.start,
-            figure.y_range.end,
-        )
-    return wrapper
+SQUARE_X = np.array([0, 1, 1, 0, 0])
+SQUARE_Y = np.array([0, 0, 1, 1, 0])
 
 
 def square(xc, yc, side):
@@ -22,8 +20,8 @@ def square(xc, yc, side):
 
 
 def rectangle(xc, yc, dx, dy):
-    x = xc + dx * np.array([0, 1, 1, 0, 0])
-    y = yc + dy * np.array([0, 0, 1, 1, 0])
+    x = xc + dx * SQUARE_X
+    y = yc + dy * SQUARE_Y
     return x, y
 
 
@@ -38,6 +36,108 @@ def tile(i, j, level):
     return x, y, side_length
 
 
+def tile_grid(level, start=None, end=None):
+    """Coordinates of every tile in an index range in x, y space
+
+    Equivalent to calling tile() and square() for each (i, j) in
+    tile_indices(start, end) but computed in a single broadcast
+
+    :param level: zoom level
+    :param start: first (i, j) index, defaults to (0, 0)
+    :param end: last (i, j) index inclusive, defaults to last tile
+    :returns: flat x, y buffers and offsets, tile k occupies
+              x[offsets[k]:offsets[k + 1]]
+    """
+    n = 2 ** level
+    si, sj = (0, 0) if start is None else start
+    ei, ej = (n - 1, n - 1) if end is None else end
+    _, _, length = tile(0, 0, level)
+    i, j = np.meshgrid(
+        np.arange(si, ei + 1),
+        np.arange(sj, ej + 1),
+        indexing="ij")
+    x = (i.reshape(-1, 1) * length) + length * SQUARE_X
+    y = (j.reshape(-1, 1) * length) + length * SQUARE_Y
+    offsets = np.arange(x.shape[0] + 1) * len(SQUARE_X)
+    return x.ravel(), y.ravel(), offsets
+
+
+def tile_polygons(keys):
+    """Closed squares for a list of (i, j, level) keys
+
+    :returns: lists of x and y arrays, one per key
+    """
+    i, j, level = np.asarray(keys, dtype=int).reshape(-1, 3).T
+    x, y, length = tile(i, j, level)
+    x = x[:, None] + length[:, None] * SQUARE_X
+    y = y[:, None] + length[:, None] * SQUARE_Y
+    return list(x), list(y)
+
+
+def nan_separated(values, offsets):
+    """Join polygons stored in a flat buffer into a single NaN separated line
+
+    Bokeh line glyphs break on NaN, which allows a whole grid to be
+    sent as one binary encoded array instead of one list per tile
+    """
+    return np.insert(values.astype("f8"), offsets[1:-1], np.nan)
+
+
+def tile_range(x_start, x_end, y_start, y_end, level):
+    """Index range of tiles at level intersecting a viewport
+
+    Tiles form an implicit quadtree, see parent() and children(), so
+    the covering range is found arithmetically and enumerating it
+    costs O(visible tiles) regardless of level
+
+    :returns: start and end (i, j) inclusive, suitable for
+              tile_grid(), end < start if viewport misses the map
+    """
+    n = 2 ** level
+    _, _, length = tile(0, 0, level)
+    si = max(int(np.floor(x_start / length)), 0)
+    sj = max(int(np.floor(y_start / length)), 0)
+    ei = min(int(np.ceil(x_end / length)) - 1, n - 1)
+    ej = min(int(np.ceil(y_end / length)) - 1, n - 1)
+    return (si, sj), (ei, ej)
+
+
+def parent(i, j, level):
+    """Index of tile containing (i, j) one level up"""
+    return i // 2, j // 2, level - 1
+
+
+def children(i, j, level):
+    """Indices of the four tiles covering (i, j) one level down"""
+    return [(2 * i + di, 2 * j + dj, level + 1)
+            for di in (0, 1)
+            for dj in (0, 1)]
+
+
+def zoom_level(x_start, x_end, screen_width, initial,
+               min_level=0, max_level=None):
+    """Level whose resolution first matches the screen resolution
+
+    :param x_start: viewport start in map units
+    :param x_end: viewport end in map units
+    :param screen_width: viewport width in screen pixels
+    :param initial: map units per pixel at level 0
+
+    A zero width viewport is treated as infinitely zoomed in, i.e.
+    max_level, or min_level when there is no maximum
+    """
+    if x_end == x_start:
+        return min_level if max_level is None else max_level
+    ratio = initial * screen_width / (x_end - x_start)
+    if ratio <= 1:
+        level = min_level
+    else:
+        level = max(int(np.ceil(np.log2(ratio))), min_level)
+    if max_level is not None:
+        level = min(level, max_level)
+    return level
+
+
 def tile_index(px, py):
     """Given coordinates in pixel space return index in tile space"""
     tile_size = 256
@@ -58,16 +158,45 @@ def global_resolution(circumference, pixels_per_tile):
     return circumference / pixels_per_tile
 
 
+def gradient(nx, ny, checker=32):
+    """Procedural RGBA image used to exercise the raster pyramid"""
+    i = np.arange(ny)[:, None]
+    j = np.arange(nx)[None, :]
+    rgba = np.empty((ny, nx, 4), dtype=np.uint8)
+    rgba[..., 0] = (255 * j) // nx
+    rgba[..., 1] = (255 * i) // ny
+    rgba[..., 2] = 255 * (((i // checker) + (j // checker)) % 2)
+    rgba[..., 3] = 255
+    return rgba
+
+
 def main():
     figure = bokeh.plotting.figure(
         sizing_mode="stretch_both",
         match_aspect=True
     )
-    callback = axis_listener(figure)
-    figure.x_range.on_change("start", callback)
-    figure.x_range.on_change("end", callback)
-    figure.y_range.on_change("start", callback)
-    figure.y_range.on_change("end", callback)
+
+    # Large raster served as viewport sized tiles, the pyramid is
+    # built by the first session and memory mapped by the rest, the
+    # file name changes with the image and the store format
+    nx, ny = 2048, 2048
+    name = "tiling-gradient-{}x{}-v{}.tiles".format(nx, ny, store.VERSION)
+    image = store.cached(
+        os.path.join(tempfile.gettempdir(), name),
+        lambda: pyramid.Pyramid(gradient(nx, ny), dw=5, dh=5),
+        dataset="gradient")
+    image_source = bokeh.models.ColumnDataSource(image.render([]))
+    image_layer = diff.TileLayer(image_source, image.render)
+    image_layer.update(image.keys(0, 5, 0, 5, ranges.SCREEN_WIDTH))
+    prefetcher = prefetch.Prefetcher(image)
+    figure.image_rgba(
+        x="x",
+        y="y",
+        dw="dw",
+        dh="dh",
+        image="image",
+        global_alpha=0.5,
+        source=image_source)
 
     min_level = 0
     max_level = 6
@@ -94,17 +223,15 @@ def main():
         source=grid_source)
 
     def draw_grid(level):
-        xs, ys = [], []
-        for i in range(2**level):
-            for j in range(2**level):
-                xc, yc, length = tile(i, j, level)
-                x, y = square(xc, yc, length)
-                xs.append(x)
-                ys.append(y)
+        extent = ranges.extent(figure)
+        if extent is None:
+            x, y, offsets = tile_grid(level)
+        else:
+            x, y, offsets = tile_grid(level, *tile_range(*extent, level))
         grid_source.data = {
-            "xs": xs,
-            "ys": ys,
-            "line_color": len(xs) * [lc[level]]
+            "xs": [nan_separated(x, offsets)],
+            "ys": [nan_separated(y, offsets)],
+            "line_color": [lc[level]]
         }
 
     if grid_visible:
@@ -132,22 +259,27 @@ def main():
     def shade(xc, yc, dx, dy, dp, level):
         si, sj = tile_index(*pixel_index(xc, yc, dp))
         ei, ej = tile_index(*pixel_index(xc + dx, yc + dy, dp))
-        xs, ys = [], []
-        for i, j in tile_indices((si, sj), (ei, ej)):
-            xc, yc, length = tile(i, j, level)
-            x, y = square(xc, yc, length)
-            xs.append(x)
-            ys.append(y)
-        print("{} tiles covering rectangle".format(len(xs)))
+        extent = ranges.extent(figure)
+        if extent is not None:
+            (vi, vj), (wi, wj) = tile_range(*extent, level)
+            si, sj = max(si, vi), max(sj, vj)
+            ei, ej = min(ei, wi), min(ej, wj)
+        keys = [(i, j, level) for i, j in tile_indices((si, sj), (ei, ej))]
+        return keys
+
+    def render_shade(keys):
+        xs, ys = tile_polygons(keys)
+        colors = [lc[key[2]] for key in keys]
         return {
             "xs": xs,
             "ys": ys,
-            "fill_color": len(xs) * [lc[level]],
-            "line_color": len(xs) * [lc[level]]
+            "fill_color": colors,
+            "line_color": colors
         }
 
-    shade_source = bokeh.models.ColumnDataSource(
-        shade(xc, yc, dx, dy, dp, level))
+    shade_source = bokeh.models.ColumnDataSource(render_shade([]))
+    shade_layer = diff.TileLayer(shade_source, render_shade)
+    shade_layer.update(shade(xc, yc, dx, dy, dp, level))
     figure.patches(xs="xs",
                    ys="ys",
                    source=shade_source,
@@ -165,7 +297,7 @@ def main():
         yc = (max_height - dy) * np.random.random()
 
         dp = resolution(global_resolution(circumference, tile_size), level)
-        shade_source.data = shade(xc, yc, dx, dy, dp, level)
+        shade_layer.update(shade(xc, yc, dx, dy, dp, level))
 
         x, y = rectangle(xc, yc, dx, dy)
         rectangle_source.data = {
@@ -183,8 +315,26 @@ def main():
                 "line_color": []
             }
         dp = resolution(global_resolution(circumference, tile_size), level)
-        shade_source.data = shade(xc, yc, dx, dy, dp, level)
+        shade_layer.update(shade(xc, yc, dx, dy, dp, level))
+
+
+    def on_viewport(x_start, x_end, y_start, y_end):
+        nonlocal level
+        width = ranges.screen_width(figure)
+        level = zoom_level(
+            x_start,
+            x_end,
+            width,
+            global_resolution(circumference, tile_size),
+            min_level=min_level,
+            max_level=max_level)
+        draw()
+        image_layer.update(image.keys(
+            x_start, x_end, y_start, y_end, width))
+        prefetcher.update(x_start, x_end, y_start, y_end, width)
 
+    document = bokeh.plotting.curdoc()
+    ranges.on_change(figure, document, on_viewport)
 
     def increment_level():
         nonlocal level
@@ -213,7 +363,6 @@ def main():
         btn = bokeh.models.Button(label=label)
         btn.on_click(on_click)
         btns.append(btn)
-    document = bokeh.plotting.curdoc()
     document.add_root(bokeh.layouts.column(
         bokeh.layouts.row(*btns),
         figure))
@@ -0,0 +1,108 @@
+"""Background tile prefetching
+
+Tiles a user is likely to need next are prepared on a thread pool
+while the current view is on screen. The next viewport is predicted
+from the velocity of recent range changes, and the parent and child
+levels of the visible tiles are warmed for zoom out and zoom in
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+
+def center(x_start, x_end, y_start, y_end):
+    return np.array([(x_start + x_end) / 2, (y_start + y_end) / 2])
+
+
+class Prefetcher(object):
+    """Warm a pyramid ahead of demand
+
+    >>> prefetcher = Prefetcher(pyramid)
+    >>> prefetcher.update(x_start, x_end, y_start, y_end, screen_width)
+
+    Pending prefetches are dropped whenever the direction of travel
+    reverses or the level changes, since their tiles are unlikely to
+    be needed any more. Keys already pending or cached are not
+    submitted again. Call update with complete viewports, e.g. from
+    ranges.on_change, partial range events give false velocities
+
+    :param pyramid: pyramid.Pyramid or store.MappedPyramid
+    :param horizon: seconds ahead to predict the viewport
+    :param min_interval: shortest seconds used to estimate velocity,
+                         avoids huge velocities from bursts of events
+    """
+    def __init__(self, pyramid, executor=None, horizon=0.5,
+                 min_interval=0.05, clock=time.time):
+        if executor is None:
+            executor = EXECUTOR
+        self.pyramid = pyramid
+        self.executor = executor
+        self.horizon = horizon
+        self.min_interval = min_interval
+        self.clock = clock
+        self.previous = None
+        self.velocity = np.zeros(2)
+        self.level = None
+        self.generation = 0
+        self.pending = {}
+
+    def update(self, x_start, x_end, y_start, y_end, screen_width):
+        """Record viewport and schedule tiles likely needed next"""
+        now = self.clock()
+        position = center(x_start, x_end, y_start, y_end)
+        level = self.pyramid.level(x_start, x_end, screen_width)
+        velocity = np.zeros(2)
+        if self.previous is not None:
+            then, before = self.previous
+            dt = max(now - then, self.min_interval)
+            velocity = (position - before) / dt
+        if (level != self.level) or (np.dot(velocity, self.velocity) < 0):
+            self.cancel()
+        self.previous = now, position
+        self.velocity = velocity
+        self.level = level
+        keys = self.predict(x_start, x_end, y_start, y_end, level)
+        self.pending = {key: future
+                        for key, future in self.pending.items()
+                        if not future.done()}
+        for key in keys:
+            if (key in self.pending) or self.pyramid.cached(*key):
+                continue
+            self.pending[key] = self.executor.submit(
+                self.load, self.generation, key)
+
+    def predict(self, x_start, x_end, y_start, y_end, level):
+        """Keys of tiles ahead of travel plus parent and child levels"""
+        width, height = x_end - x_start, y_end - y_start
+        dx, dy = self.velocity * self.horizon
+        dx = float(np.clip(dx, -width, width))
+        dy = float(np.clip(dy, -height, height))
+        extents = [((x_start + dx, x_end + dx, y_start + dy, y_end + dy),
+                    level)]
+        if level > 0:
+            extents.append(((x_start, x_end, y_start, y_end), level - 1))
+        if level < self.pyramid.max_level:
+            extents.append(((x_start, x_end, y_start, y_end), level + 1))
+        keys = []
+        for extent, level in extents:
+            (si, sj), (ei, ej) = self.pyramid.tile_range(*extent, level)
+            keys += [(i, j, level)
+                     for i in range(si, ei + 1)
+                     for j in range(sj, ej + 1)]
+        return keys
+
+    def load(self, generation, key):
+        if generation != self.generation:
+            return
+        i, j, level = key
+        self.pyramid.prefetch(i, j, level)
+
+    def cancel(self):
+        """Drop pending prefetches, running ones finish quietly"""
+        self.generation += 1
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
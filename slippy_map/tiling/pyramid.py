@@ -0,0 +1,171 @@
+"""Raster tile pyramid
+
+Large RGBA images are cut into 256 x 256 tiles at successively
+halved resolutions so that a viewport only needs the handful of
+tiles that cover it at a resolution close to the screen resolution
+
+Level 0 fits the whole image inside a single tile, the last
+level holds the image at its native resolution
+"""
+import numpy as np
+import cache as tile_cache
+
+
+TILE_SIZE = 256
+
+
+def downsample(rgba):
+    """Halve resolution of (ny, nx, 4) array by averaging 2 x 2 blocks
+
+    Odd rows/columns are padded by repeating the edge
+    """
+    ny, nx = rgba.shape[:2]
+    rgba = np.pad(rgba, ((0, ny % 2), (0, nx % 2), (0, 0)), mode="edge")
+    blocks = rgba.reshape(
+        rgba.shape[0] // 2, 2,
+        rgba.shape[1] // 2, 2,
+        rgba.shape[2]).astype(np.uint16)
+    return (blocks.sum(axis=(1, 3)) // 4).astype(np.uint8)
+
+
+def max_level(ny, nx, tile_size=TILE_SIZE):
+    """Number of halvings needed to fit image inside a single tile"""
+    largest = max(ny, nx)
+    if largest <= tile_size:
+        return 0
+    return int(np.ceil(np.log2(largest / tile_size)))
+
+
+class Pyramid(object):
+    """Tiles of an RGBA image placed at x, y with size dw, dh
+
+    Every level is held in memory, about 4/3 of the size of rgba, and
+    tiles are views into those levels. Unnamed pyramids serve views
+    directly, named pyramids are keyed by (dataset, level, i, j, style)
+    in the process wide cache.shared() so sessions share tile objects
+    without copying pixels
+
+    :param rgba: (ny, nx, 4) uint8 array, row 0 at the bottom
+    :param cache: cache to store tiles in, defaults to cache.shared()
+                  for named datasets and no cache otherwise
+    :param dataset: identifies the image inside a shared cache
+    :param style: identifies how the image was coloured
+    """
+    def __init__(self, rgba, x=0, y=0, dw=1, dh=1,
+                 cache=None, dataset=None, style=None,
+                 tile_size=TILE_SIZE):
+        self.use_cache(cache, dataset, style)
+        self.x = x
+        self.y = y
+        self.dw = dw
+        self.dh = dh
+        self.tile_size = tile_size
+        self.shape = rgba.shape[:2]
+        self.max_level = max_level(*self.shape, tile_size)
+        self.images = [rgba]
+        for _ in range(self.max_level):
+            self.images.insert(0, downsample(self.images[0]))
+
+    def use_cache(self, cache=None, dataset=None, style=None):
+        """Set tile cache, cache.shared() by default for named datasets"""
+        if (cache is None) and (dataset is not None):
+            cache = tile_cache.shared()
+        if dataset is None:
+            dataset = id(self)
+        self.cache = cache
+        self.dataset = dataset
+        self.style = style
+
+    @property
+    def dx(self):
+        return self.dw / self.shape[1]
+
+    @property
+    def dy(self):
+        return self.dh / self.shape[0]
+
+    def level_shape(self, level):
+        """Rows and columns of image at level"""
+        ny, nx = self.shape
+        for _ in range(self.max_level - level):
+            ny, nx = (ny + 1) // 2, (nx + 1) // 2
+        return ny, nx
+
+    def level_tiles(self, level):
+        """Number of tile rows and columns at level"""
+        ny, nx = self.level_shape(level)
+        n = self.tile_size
+        return (ny + n - 1) // n, (nx + n - 1) // n
+
+    def pixel_size(self, level):
+        """Width and height of a pixel at level in map units"""
+        factor = 2 ** (self.max_level - level)
+        return self.dx * factor, self.dy * factor
+
+    def level(self, x_start, x_end, screen_width):
+        """Coarsest level with at least one pixel per screen pixel"""
+        dp = (x_end - x_start) / screen_width
+        ratio = dp / self.dx
+        if ratio <= 1:
+            return self.max_level
+        level = self.max_level - int(np.floor(np.log2(ratio)))
+        return max(level, 0)
+
+    def tile_range(self, x_start, x_end, y_start, y_end, level):
+        """Index range of tiles at level intersecting a viewport"""
+        rows, columns = self.level_tiles(level)
+        px, py = self.pixel_size(level)
+        sx, sy = self.tile_size * px, self.tile_size * py
+        si = max(int(np.floor((x_start - self.x) / sx)), 0)
+        sj = max(int(np.floor((y_start - self.y) / sy)), 0)
+        ei = min(int(np.ceil((x_end - self.x) / sx)), columns) - 1
+        ej = min(int(np.ceil((y_end - self.y) / sy)), rows) - 1
+        return (si, sj), (ei, ej)
+
+    def keys(self, x_start, x_end, y_start, y_end, screen_width):
+        """(i, j, level) of every tile needed to draw a viewport"""
+        level = self.level(x_start, x_end, screen_width)
+        (si, sj), (ei, ej) = self.tile_range(
+            x_start, x_end, y_start, y_end, level)
+        return [(i, j, level)
+                for i in range(si, ei + 1)
+                for j in range(sj, ej + 1)]
+
+    def tile(self, i, j, level):
+        """RGBA values of a single tile, edge tiles may be smaller"""
+        if self.cache is None:
+            return self.cut(i, j, level)
+        key = (self.dataset, level, i, j, self.style)
+        values = self.cache.get(key)
+        if values is None:
+            values = self.cut(i, j, level)
+            self.cache.set(key, values)
+        return values
+
+    def cached(self, i, j, level):
+        """True if a tile is ready in the cache"""
+        if self.cache is None:
+            return True
+        return (self.dataset, level, i, j, self.style) in self.cache
+
+    def cut(self, i, j, level):
+        """RGBA view of a tile in the level image, no data is copied"""
+        n = self.tile_size
+        return self.images[level][j * n:(j + 1) * n, i * n:(i + 1) * n]
+
+    def prefetch(self, i, j, level):
+        """Prepare a tile ahead of render, safe to call from a thread"""
+        self.tile(i, j, level)
+
+    def render(self, keys):
+        """Columns for an image_rgba glyph, one row per key"""
+        data = {"x": [], "y": [], "dw": [], "dh": [], "image": []}
+        for i, j, level in keys:
+            values = self.tile(i, j, level)
+            px, py = self.pixel_size(level)
+            data["x"].append(self.x + i * self.tile_size * px)
+            data["y"].append(self.y + j * self.tile_size * py)
+            data["dw"].append(values.shape[1] * px)
+            data["dh"].append(values.shape[0] * py)
+            data["image"].append(values)
+        return data
@@ -0,0 +1,58 @@
+"""Figure viewport helpers shared by the tiled apps"""
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir, "chronometer"))
+import rx
+
+
+SCREEN_WIDTH = 800  # Assumed until the figure has been laid out
+
+
+def extent(figure):
+    """Current x_start, x_end, y_start, y_end or None if not yet known
+
+    Ranges that have not been computed yet are None or NaN
+    """
+    values = (
+        figure.x_range.start,
+        figure.x_range.end,
+        figure.y_range.start,
+        figure.y_range.end)
+    if any(value is None for value in values):
+        return None
+    if not np.all(np.isfinite(values)):
+        return None
+    return values
+
+
+def on_change(figure, document, render):
+    """Call render(x_start, x_end, y_start, y_end) once per document tick
+
+    Panning changes start and end of both ranges in four separate
+    events, they are coalesced so render sees the complete viewport
+
+    :returns: stream of viewport changes
+    """
+    stream = rx.Stream()
+    stream.subscribe(lambda _: on_extent(extent(figure)))
+
+    def on_extent(values):
+        if values is not None:
+            render(*values)
+
+    callback = rx.callback(stream, document)
+    for axis in (figure.x_range, figure.y_range):
+        axis.on_change("start", callback)
+        axis.on_change("end", callback)
+    return stream
+
+
+def screen_width(figure):
+    """Inner width of figure in pixels, SCREEN_WIDTH until laid out"""
+    try:
+        width = figure.inner_width
+    except ValueError:  # Unset readonly properties raise on Bokeh 3
+        width = None
+    return width or SCREEN_WIDTH
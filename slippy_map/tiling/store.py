@@ -0,0 +1,137 @@
+"""On-disk tile store
+
+A pyramid is written once to a single file made of a fixed size
+header, an index of (level, i, j) to byte offset records and the raw
+uint8 RGBA values of every tile. Any process can then memory map the
+file and hand out tiles as views without decoding or copying, the
+operating system page cache is shared between bokeh server workers
+
+>>> write("gradient.tiles", pyramid.Pyramid(rgba))
+>>> mapped = MappedPyramid("gradient.tiles")
+>>> mapped.tile(0, 0, 0).shape
+(256, 256, 4)
+"""
+import os
+import tempfile
+import numpy as np
+import pyramid
+
+
+MAGIC = b"TILE"
+VERSION = 1
+HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("tile_size", "<u4"),
+    ("max_level", "<u4"),
+    ("ny", "<u4"),
+    ("nx", "<u4"),
+    ("count", "<u8"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("dw", "<f8"),
+    ("dh", "<f8")])
+INDEX = np.dtype([
+    ("level", "<u4"),
+    ("i", "<u4"),
+    ("j", "<u4"),
+    ("ny", "<u4"),
+    ("nx", "<u4"),
+    ("offset", "<u8")])
+
+
+def write(path, pyr):
+    """Save every tile of a pyramid.Pyramid to path
+
+    Tiles are written in level, j, i order to a temporary file which
+    is moved into place so readers never see a partial store
+    """
+    keys = [(level, i, j)
+            for level in range(pyr.max_level + 1)
+            for j in range(pyr.level_tiles(level)[0])
+            for i in range(pyr.level_tiles(level)[1])]
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["tile_size"] = pyr.tile_size
+    header["max_level"] = pyr.max_level
+    header["ny"], header["nx"] = pyr.shape
+    header["count"] = len(keys)
+    header["x"], header["y"] = pyr.x, pyr.y
+    header["dw"], header["dh"] = pyr.dw, pyr.dh
+    index = np.zeros(len(keys), dtype=INDEX)
+    offset = HEADER.itemsize + INDEX.itemsize * len(keys)
+    # Unique temporary file, several sessions may build the same store
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        prefix=os.path.basename(path) + ".",
+        suffix=".tmp")
+    with os.fdopen(fd, "wb") as stream:
+        stream.seek(offset)
+        for row, (level, i, j) in enumerate(keys):
+            values = pyr.tile(i, j, level)
+            index[row] = (level, i, j) + values.shape[:2] + (offset,)
+            stream.write(values.tobytes())
+            offset += values.nbytes
+        stream.seek(0)
+        stream.write(header.tobytes())
+        stream.write(index.tobytes())
+    os.replace(tmp, path)
+
+
+def cached(path, build, cache=None, dataset=None, style=None):
+    """MappedPyramid of path, calling build() to create it if missing"""
+    if not os.path.exists(path):
+        write(path, build())
+    return MappedPyramid(path, cache=cache, dataset=dataset, style=style)
+
+
+class MappedPyramid(pyramid.Pyramid):
+    """Pyramid whose tiles are read from a memory mapped store
+
+    Tiles are views of the mapped file. They go through the same
+    cache as pyramid.Pyramid, so a named dataset shares tiles with
+    every session in the process via cache.shared()
+
+    :param cache: cache to store tiles in, defaults to cache.shared()
+                  for named datasets and no cache otherwise
+    :param dataset: identifies the image inside a shared cache
+    :param style: identifies how the image was coloured
+    :raises ValueError: if path is not a tile store of this VERSION
+    """
+    def __init__(self, path, cache=None, dataset=None, style=None):
+        self.use_cache(cache, dataset, style)
+        self.path = path
+        self.buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        header = self.buffer[:HEADER.itemsize].view(HEADER)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError("not a tile store: {}".format(path))
+        if header["version"] != VERSION:
+            raise ValueError("unsupported tile store version {}: {}".format(
+                header["version"], path))
+        count = int(header["count"])
+        self.index = self.buffer[
+            HEADER.itemsize:HEADER.itemsize + INDEX.itemsize * count
+        ].view(INDEX)
+        self.tile_size = int(header["tile_size"])
+        self.max_level = int(header["max_level"])
+        self.shape = int(header["ny"]), int(header["nx"])
+        self.x, self.y = float(header["x"]), float(header["y"])
+        self.dw, self.dh = float(header["dw"]), float(header["dh"])
+        self.first = [0]
+        for level in range(self.max_level + 1):
+            rows, columns = self.level_tiles(level)
+            self.first.append(self.first[-1] + rows * columns)
+
+    def cut(self, i, j, level):
+        """RGBA view into the mapped file, no data is copied"""
+        _, columns = self.level_tiles(level)
+        record = self.index[self.first[level] + j * columns + i]
+        ny, nx = int(record["ny"]), int(record["nx"])
+        offset = int(record["offset"])
+        values = self.buffer[offset:offset + ny * nx * 4]
+        return np.asarray(values).reshape(ny, nx, 4)
+
+    def prefetch(self, i, j, level):
+        """Cache a tile and fault its pages into memory"""
+        self.tile(i, j, level).max()
@@ -0,0 +1,85 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import unittest.mock
+import os
+import tempfile
+import numpy as np
+import cache
+import pyramid
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        lru = cache.LRUCache(max_bytes=16)
+        lru.set("a", np.zeros(8, dtype=np.uint8))
+        lru.set("b", np.zeros(8, dtype=np.uint8))
+        lru.get("a")
+        lru.set("c", np.zeros(8, dtype=np.uint8))
+        self.assertIn("a", lru)
+        self.assertNotIn("b", lru)
+        self.assertEqual(lru.nbytes, 16)
+
+    def test_counters(self):
+        lru = cache.LRUCache(max_bytes=8)
+        lru.get("a")
+        lru.set("a", np.zeros(8, dtype=np.uint8))
+        lru.get("a")
+        lru.set("b", np.zeros(8, dtype=np.uint8))
+        result = lru.stats()
+        self.assertEqual(result["hits"], 1)
+        self.assertEqual(result["misses"], 1)
+        self.assertEqual(result["evictions"], 1)
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_disk_cache_round_trip(self):
+        disk = cache.DiskCache(self.directory.name)
+        key = ("gradient", 1, 0, 0, None)
+        disk.set(key, np.arange(4, dtype=np.uint8))
+        np.testing.assert_array_equal(disk.get(key), [0, 1, 2, 3])
+        self.assertIsNone(disk.get(("gradient", 1, 0, 1, None)))
+
+    def test_tiered_cache_promotes_disk_hits(self):
+        disk = cache.DiskCache(self.directory.name)
+        disk.set("a", np.arange(4, dtype=np.uint8))
+        tiered = cache.TieredCache(cache.LRUCache(), disk)
+        tiered.get("a")
+        self.assertIn("a", tiered.memory)
+        self.assertEqual(tiered.stats()["disk"]["hits"], 1)
+
+    def test_writers_use_separate_temporary_files(self):
+        disk = cache.DiskCache(self.directory.name)
+        with unittest.mock.patch("cache.os.replace",
+                                 wraps=os.replace) as replace:
+            disk.set("key", np.arange(4))
+            disk.set("key", np.arange(4))
+        (first, _), _ = replace.call_args_list[0]
+        (second, _), _ = replace.call_args_list[1]
+        self.assertNotEqual(first, second)
+        self.assertEqual(os.listdir(self.directory.name),
+                         [os.path.basename(disk.path("key"))])
+
+    def test_contains(self):
+        disk = cache.DiskCache(self.directory.name)
+        tiered = cache.TieredCache(cache.LRUCache(), disk)
+        self.assertNotIn("key", tiered)
+        disk.set("key", np.arange(4))
+        self.assertIn("key", disk)
+        self.assertIn("key", tiered)
+
+
+class TestShared(unittest.TestCase):
+    def test_shared_is_a_singleton(self):
+        self.assertIs(cache.shared(), cache.shared())
+
+    def test_named_pyramids_share_tiles(self):
+        rgba = np.zeros((300, 300, 4), dtype=np.uint8)
+        first = pyramid.Pyramid(rgba, dataset="test_shared")
+        second = pyramid.Pyramid(rgba, dataset="test_shared")
+        self.assertIs(first.tile(0, 0, 1), second.tile(0, 0, 1))
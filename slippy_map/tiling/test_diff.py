@@ -0,0 +1,62 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import unittest.mock
+import bokeh.models
+import diff
+
+
+def render(keys):
+    return {
+        "key": [str(key) for key in keys],
+        "i": [key[0] for key in keys]
+    }
+
+
+class TestDiff(unittest.TestCase):
+    def test_diff(self):
+        entered, exited = diff.diff([(0, 0), (0, 1)], [(0, 1), (1, 1)])
+        self.assertEqual(entered, [(1, 1)])
+        self.assertEqual(exited, {(0, 0)})
+
+
+class TestTileLayer(unittest.TestCase):
+    def setUp(self):
+        self.source = bokeh.models.ColumnDataSource(render([]))
+        self.layer = diff.TileLayer(self.source, render)
+
+    def test_update_given_new_tiles_streams(self):
+        self.layer.update([(0, 0)])
+        with unittest.mock.patch.object(
+                bokeh.models.ColumnDataSource, "stream") as stream:
+            self.layer.update([(0, 0), (0, 1)])
+        stream.assert_called_once_with(render([(0, 1)]))
+
+    def test_update_reuses_rows_of_exited_tiles(self):
+        self.layer.update([(0, 0), (0, 1)])
+        with unittest.mock.patch.object(
+                bokeh.models.ColumnDataSource, "stream") as stream:
+            self.layer.update([(0, 0), (1, 1)])
+        stream.assert_not_called()
+        self.assertEqual(self.source.data["key"], ["(0, 0)", "(1, 1)"])
+
+    def test_update_removes_exited_tiles(self):
+        self.layer.update([(0, 0), (0, 1), (0, 2), (0, 3)])
+        self.layer.update([(0, 0), (0, 3)])
+        self.assertEqual(sorted(self.source.data["key"]),
+                         ["(0, 0)", "(0, 3)"])
+        self.assertEqual(self.layer.keys, [(0, 0), (0, 3)])
+
+    def test_update_keeps_rows_and_keys_aligned(self):
+        for keys in [
+                [(0, 0), (0, 1), (0, 2)],
+                [(0, 1), (0, 2), (0, 3), (0, 4)],
+                [(0, 4)],
+                [(0, 4), (0, 5), (0, 6)],
+                [(0, 6), (0, 0)]]:
+            self.layer.update(keys)
+            self.assertEqual(sorted(self.source.data["key"]),
+                             sorted(str(key) for key in keys))
+            self.assertEqual(self.source.data["key"],
+                             [str(key) for key in self.layer.keys])
+            for key, row in self.layer.rows.items():
+                self.assertEqual(self.layer.keys[row], key)
@@ -0,0 +1,112 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import unittest.mock
+from concurrent.futures import Future
+import numpy as np
+import bokeh.document
+import bokeh.plotting
+import cache
+import pyramid
+import prefetch
+import ranges
+
+
+class Deferred(object):
+    """Executor that holds work until run() is called"""
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.tasks.append((future, fn, args))
+        return future
+
+    def run(self):
+        for future, fn, args in self.tasks:
+            if future.set_running_or_notify_cancel():
+                future.set_result(fn(*args))
+        self.tasks = []
+
+
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        rgba = np.zeros((1024, 1024, 4), dtype=np.uint8)
+        self.pyramid = pyramid.Pyramid(
+            rgba, dw=4, dh=4, cache=cache.LRUCache())
+        self.pyramid.prefetch = unittest.mock.Mock()
+        self.executor = Deferred()
+        self.time = 0
+        self.prefetcher = prefetch.Prefetcher(
+            self.pyramid,
+            executor=self.executor,
+            horizon=1,
+            clock=lambda: self.time)
+
+    def test_predict_includes_parent_and_child_levels(self):
+        keys = self.prefetcher.predict(0, 1, 0, 1, 1)
+        levels = set(level for _, _, level in keys)
+        self.assertEqual(levels, {0, 1, 2})
+
+    def test_predict_follows_velocity(self):
+        self.prefetcher.update(0, 1, 0, 1, 256)
+        self.time = 1
+        self.prefetcher.update(1, 2, 0, 1, 256)
+        keys = self.prefetcher.predict(1, 2, 0, 1, 2)
+        self.assertIn((2, 0, 2), keys)
+        self.assertNotIn((0, 0, 2), keys)
+
+    def test_update_warms_tiles(self):
+        self.prefetcher.update(0, 1, 0, 1, 256)
+        self.executor.run()
+        self.pyramid.prefetch.assert_any_call(0, 0, 2)
+
+    def test_reversal_cancels_pending_prefetches(self):
+        self.prefetcher.update(1, 2, 0, 1, 256)
+        self.time = 1
+        self.prefetcher.update(2, 3, 0, 1, 256)
+        stale = list(self.prefetcher.pending.values())
+        self.time = 2
+        self.prefetcher.update(1, 2, 0, 1, 256)
+        self.assertTrue(all(future.cancelled() for future in stale))
+
+    def test_level_change_skips_stale_work(self):
+        self.prefetcher.update(0, 1, 0, 1, 256)
+        self.prefetcher.update(0, 4, 0, 4, 256)
+        self.executor.run()
+        levels = set(call[0][2]
+                     for call in self.pyramid.prefetch.call_args_list)
+        self.assertNotIn(2, levels)
+
+    def test_repeated_viewport_submits_each_key_once(self):
+        for _ in range(4):
+            self.prefetcher.update(0, 1, 0, 1, 256)
+        keys = self.prefetcher.predict(0, 1, 0, 1, 2)
+        self.assertEqual(len(self.executor.tasks), len(set(keys)))
+
+    def test_cached_tiles_are_not_submitted(self):
+        self.pyramid.tile(0, 0, 2)
+        self.prefetcher.update(0, 1, 0, 1, 256)
+        self.executor.run()
+        calls = [call[0] for call in self.pyramid.prefetch.call_args_list]
+        self.assertNotIn((0, 0, 2), calls)
+        self.assertIn((0, 0, 1), calls)
+
+    def test_velocity_from_coalesced_range_events(self):
+        document = bokeh.document.Document()
+        figure = bokeh.plotting.figure(x_range=(0, 1), y_range=(0, 1))
+        ranges.on_change(
+            figure, document,
+            lambda *extent: self.prefetcher.update(*extent, 256))
+
+        def pan(x_start, x_end):
+            figure.x_range.start = x_start
+            figure.x_range.end = x_end
+            figure.y_range.start = 0
+            figure.y_range.end = 1
+            for callback in document.session_callbacks:
+                callback.callback()
+
+        pan(1, 2)
+        self.time = 1
+        pan(2, 3)
+        np.testing.assert_array_equal(self.prefetcher.velocity, [1, 0])
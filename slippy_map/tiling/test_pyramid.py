@@ -0,0 +1,71 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import numpy as np
+import pyramid
+
+
+class TestDownsample(unittest.TestCase):
+    def test_downsample_averages_blocks(self):
+        rgba = np.zeros((2, 2, 4), dtype=np.uint8)
+        rgba[..., 0] = [[0, 4], [8, 12]]
+        result = pyramid.downsample(rgba)
+        self.assertEqual(result.shape, (1, 1, 4))
+        self.assertEqual(result[0, 0, 0], 6)
+
+    def test_downsample_given_odd_shape(self):
+        rgba = np.zeros((3, 5, 4), dtype=np.uint8)
+        result = pyramid.downsample(rgba)
+        self.assertEqual(result.shape, (2, 3, 4))
+
+
+class TestMaxLevel(unittest.TestCase):
+    def test_max_level_given_single_tile(self):
+        self.assertEqual(pyramid.max_level(256, 100), 0)
+
+    def test_max_level_given_1800_by_900(self):
+        self.assertEqual(pyramid.max_level(900, 1800), 3)
+
+
+class TestPyramid(unittest.TestCase):
+    def setUp(self):
+        self.rgba = np.random.randint(
+            0, 255, size=(600, 1000, 4)).astype(np.uint8)
+        self.pyramid = pyramid.Pyramid(self.rgba, dw=10, dh=6)
+
+    def test_levels(self):
+        shapes = [image.shape[:2] for image in self.pyramid.images]
+        self.assertEqual(shapes, [(150, 250), (300, 500), (600, 1000)])
+
+    def test_tile_at_native_resolution(self):
+        result = self.pyramid.tile(1, 2, 2)
+        np.testing.assert_array_equal(result, self.rgba[512:, 256:512])
+
+    def test_tile_is_a_view_of_level_image(self):
+        result = self.pyramid.tile(0, 0, 1)
+        self.assertTrue(np.shares_memory(result, self.pyramid.images[1]))
+
+    def test_level_given_whole_image_on_small_screen(self):
+        self.assertEqual(self.pyramid.level(0, 10, 250), 0)
+
+    def test_level_given_native_resolution(self):
+        self.assertEqual(self.pyramid.level(0, 1, 100), 2)
+
+    def test_keys_only_cover_viewport(self):
+        result = self.pyramid.keys(0, 1, 0, 1, 100)
+        self.assertEqual(result, [(0, 0, 2)])
+
+    def test_render_places_tiles_in_map_space(self):
+        data = self.pyramid.render([(3, 2, 2)])
+        self.assertAlmostEqual(data["x"][0], 7.68)
+        self.assertAlmostEqual(data["y"][0], 5.12)
+        self.assertAlmostEqual(data["dw"][0], 2.32)
+        self.assertAlmostEqual(data["dh"][0], 0.88)
+
+
+    def test_level_shape_matches_images(self):
+        for level, image in enumerate(self.pyramid.images):
+            self.assertEqual(self.pyramid.level_shape(level),
+                             image.shape[:2])
+
+    def test_level_tiles(self):
+        self.assertEqual(self.pyramid.level_tiles(2), (3, 4))
@@ -0,0 +1,55 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import numpy as np
+import bokeh.document
+import bokeh.plotting
+import ranges
+
+
+class TestExtent(unittest.TestCase):
+    def test_extent_given_ranges_not_yet_computed(self):
+        figure = bokeh.plotting.figure()
+        self.assertIsNone(ranges.extent(figure))
+
+    def test_extent_given_nan_range(self):
+        figure = bokeh.plotting.figure(x_range=(0, 1), y_range=(0, 1))
+        figure.y_range.end = np.nan
+        self.assertIsNone(ranges.extent(figure))
+
+    def test_extent(self):
+        figure = bokeh.plotting.figure(x_range=(0, 1), y_range=(2, 3))
+        self.assertEqual(ranges.extent(figure), (0, 1, 2, 3))
+
+
+class TestOnChange(unittest.TestCase):
+    def setUp(self):
+        self.document = bokeh.document.Document()
+        self.figure = bokeh.plotting.figure(x_range=(0, 1), y_range=(0, 1))
+        self.history = []
+        ranges.on_change(self.figure, self.document,
+                         lambda *extent: self.history.append(extent))
+
+    def flush(self):
+        for callback in self.document.session_callbacks:
+            callback.callback()
+
+    def test_pan_renders_once_per_tick(self):
+        self.figure.x_range.start = 1
+        self.figure.x_range.end = 2
+        self.figure.y_range.start = 3
+        self.figure.y_range.end = 4
+        self.assertEqual(self.history, [])
+        self.assertEqual(len(self.document.session_callbacks), 1)
+        self.flush()
+        self.assertEqual(self.history, [(1, 2, 3, 4)])
+
+    def test_incomplete_extent_is_not_rendered(self):
+        self.figure.y_range.end = np.nan
+        self.flush()
+        self.assertEqual(self.history, [])
+
+
+class TestScreenWidth(unittest.TestCase):
+    def test_screen_width_before_layout(self):
+        figure = bokeh.plotting.figure()
+        self.assertEqual(ranges.screen_width(figure), ranges.SCREEN_WIDTH)
@@ -0,0 +1,93 @@
+# pylint: disable=missing-docstring, invalid-name
+import unittest
+import unittest.mock
+import os
+import tempfile
+import numpy as np
+import cache
+import pyramid
+import store
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.tiles")
+        rgba = np.random.randint(
+            0, 255, size=(600, 1000, 4)).astype(np.uint8)
+        self.pyramid = pyramid.Pyramid(rgba, x=1, y=2, dw=10, dh=6)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_mapped_pyramid_has_same_geometry(self):
+        store.write(self.path, self.pyramid)
+        mapped = store.MappedPyramid(self.path)
+        self.assertEqual(mapped.shape, (600, 1000))
+        self.assertEqual(mapped.max_level, 2)
+        self.assertEqual((mapped.x, mapped.y, mapped.dw, mapped.dh),
+                         (1, 2, 10, 6))
+
+    def test_mapped_pyramid_tiles_match_pyramid(self):
+        store.write(self.path, self.pyramid)
+        mapped = store.MappedPyramid(self.path)
+        for level in range(3):
+            rows, columns = self.pyramid.level_tiles(level)
+            for j in range(rows):
+                for i in range(columns):
+                    np.testing.assert_array_equal(
+                        mapped.tile(i, j, level),
+                        self.pyramid.tile(i, j, level))
+
+    def test_mapped_pyramid_given_other_file(self):
+        with open(self.path, "wb") as stream:
+            stream.write(bytes(store.HEADER.itemsize))
+        with self.assertRaises(ValueError):
+            store.MappedPyramid(self.path)
+
+    def test_mapped_pyramid_given_other_version(self):
+        store.write(self.path, self.pyramid)
+        with open(self.path, "r+b") as stream:
+            stream.seek(4)
+            stream.write(np.uint32(store.VERSION + 1).tobytes())
+        with self.assertRaises(ValueError):
+            store.MappedPyramid(self.path)
+
+    def test_mapped_pyramid_render(self):
+        store.write(self.path, self.pyramid)
+        mapped = store.MappedPyramid(self.path)
+        keys = mapped.keys(1, 11, 2, 8, 250)
+        self.assertEqual(mapped.render(keys)["x"],
+                         self.pyramid.render(keys)["x"])
+
+    def test_cached_only_builds_once(self):
+        build = unittest.mock.Mock(return_value=self.pyramid)
+        store.cached(self.path, build)
+        store.cached(self.path, build)
+        build.assert_called_once_with()
+
+    def test_writers_use_separate_temporary_files(self):
+        with unittest.mock.patch("store.os.replace",
+                                 wraps=os.replace) as replace:
+            store.write(self.path, self.pyramid)
+            store.write(self.path, self.pyramid)
+        (first, _), _ = replace.call_args_list[0]
+        (second, _), _ = replace.call_args_list[1]
+        self.assertNotEqual(first, second)
+        self.assertEqual(os.path.dirname(first), self.directory.name)
+        self.assertEqual(os.listdir(self.directory.name), ["test.tiles"])
+
+    def test_named_mapped_pyramid_shares_cache(self):
+        tiles = cache.LRUCache()
+        store.write(self.path, self.pyramid)
+        first = store.MappedPyramid(self.path, cache=tiles, dataset="a")
+        second = store.MappedPyramid(self.path, cache=tiles, dataset="a")
+        first.tile(0, 0, 1)
+        second.tile(0, 0, 1)
+        self.assertEqual(tiles.stats()["misses"], 1)
+        self.assertEqual(tiles.stats()["hits"], 1)
+
+    def test_cached_named_dataset_uses_shared_cache(self):
+        mapped = store.cached(self.path, lambda: self.pyramid,
+                              dataset="test-store")
+        self.assertIs(mapped.cache, cache.shared())
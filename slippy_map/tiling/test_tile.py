@@ -70,3 +70,100 @@ class TestTileIndices(unittest.TestCase):
             (2, 1)
         ]
         self.assertEqual(expect, result)
+
+
+class TestTileGrid(unittest.TestCase):
+    def test_tile_grid_matches_tile_and_square(self):
+        level = 2
+        x, y, offsets = main.tile_grid(level, (1, 0), (3, 2))
+        k = 0
+        for i, j in main.tile_indices((1, 0), (3, 2)):
+            ex, ey = main.square(*main.tile(i, j, level))
+            s, e = offsets[k], offsets[k + 1]
+            np.testing.assert_array_equal(ex, x[s:e])
+            np.testing.assert_array_equal(ey, y[s:e])
+            k += 1
+        self.assertEqual(len(offsets), k + 1)
+
+    def test_tile_grid_given_level_defaults_to_all_tiles(self):
+        x, y, offsets = main.tile_grid(3)
+        self.assertEqual(offsets[-1], 5 * 4**3)
+        self.assertEqual(x.shape, y.shape)
+
+    def test_nan_separated(self):
+        values = np.arange(6)
+        offsets = np.array([0, 3, 6])
+        result = main.nan_separated(values, offsets)
+        expect = [0, 1, 2, np.nan, 3, 4, 5]
+        np.testing.assert_array_equal(expect, result)
+
+
+class TestTileRange(unittest.TestCase):
+    def test_tile_range_given_whole_map(self):
+        result = main.tile_range(0, 5, 0, 5, 2)
+        expect = ((0, 0), (3, 3))
+        self.assertEqual(expect, result)
+
+    def test_tile_range_given_viewport_inside_map(self):
+        result = main.tile_range(1.3, 2.4, 0.1, 1.2, 2)
+        expect = ((1, 0), (1, 0))
+        self.assertEqual(expect, result)
+
+    def test_tile_range_clipped_to_map(self):
+        result = main.tile_range(-10, 2, 4, 10, 1)
+        expect = ((0, 1), (0, 1))
+        self.assertEqual(expect, result)
+
+    def test_tile_range_given_viewport_outside_map(self):
+        (si, sj), (ei, ej) = main.tile_range(6, 7, 6, 7, 1)
+        self.assertTrue(ei < si)
+        self.assertTrue(ej < sj)
+
+
+class TestQuadtree(unittest.TestCase):
+    def test_parent(self):
+        self.assertEqual(main.parent(3, 2, 2), (1, 1, 1))
+
+    def test_children(self):
+        result = main.children(1, 0, 1)
+        expect = [(2, 0, 2), (2, 1, 2), (3, 0, 2), (3, 1, 2)]
+        self.assertEqual(expect, result)
+
+
+class TestZoomLevel(unittest.TestCase):
+    def test_zoom_level_given_whole_map_on_screen(self):
+        self.check(0, 5, 256, expect=0)
+
+    def test_zoom_level_given_quarter_of_map(self):
+        self.check(0, 1.25, 256, expect=2)
+
+    def test_zoom_level_given_intermediate_width(self):
+        self.check(0, 2, 256, expect=2)
+
+    def test_zoom_level_clipped_to_max_level(self):
+        self.check(0, 0.001, 256, expect=6, max_level=6)
+
+    def test_zoom_level_given_zero_width(self):
+        self.check(1, 1, 256, expect=6, max_level=6)
+
+    def test_zoom_level_given_zero_width_and_no_max_level(self):
+        self.check(1, 1, 256, expect=0)
+
+    def check(self, x_start, x_end, screen_width, expect, max_level=None):
+        initial = main.global_resolution(5, 256)
+        result = main.zoom_level(x_start, x_end, screen_width, initial,
+                                 max_level=max_level)
+        self.assertEqual(expect, result)
+
+
+class TestTilePolygons(unittest.TestCase):
+    def test_tile_polygons_matches_tile_and_square(self):
+        keys = [(0, 1, 2), (3, 2, 4)]
+        xs, ys = main.tile_polygons(keys)
+        for key, x, y in zip(keys, xs, ys):
+            ex, ey = main.square(*main.tile(*key))
+            np.testing.assert_array_almost_equal(ex, x)
+            np.testing.assert_array_almost_equal(ey, y)
+
+    def test_tile_polygons_given_no_keys(self):
+        self.assertEqual(main.tile_polygons([]), ([], []))
@@ -0,0 +1,6 @@
+"""Pre-warm matplotlib.pyplot and matplotlib.collections per server process"""
+
+
+def on_server_loaded(server_context):
+    import matplotlib.collections  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
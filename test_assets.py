@@ -0,0 +1,29 @@
+import unittest
+import unittest.mock
+import numpy as np
+import assets
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        assets.clear()
+
+    def tearDown(self):
+        assets.clear()
+
+    def test_build_called_once(self):
+        build = unittest.mock.Mock(return_value=np.zeros(3))
+        first = assets.get("zeros", build)
+        second = assets.get("zeros", build)
+        self.assertIs(first, second)
+        build.assert_called_once_with()
+
+    def test_stats_count_hits(self):
+        for _ in range(3):
+            assets.get("zeros", lambda: np.zeros(3))
+        self.assertEqual(assets.stats()["zeros"]["hits"], 2)
+
+    def test_arrays_are_read_only(self):
+        xs, ys = assets.get("lines", lambda: ([np.zeros(2)], [np.ones(2)]))
+        with self.assertRaises(ValueError):
+            xs[0][0] = 1
@@ -4,41 +4,32 @@ import bokeh.models
 import bokeh.layouts
 
 import datetime as dt
-from functools import wraps
-class throttle(object):
-    def __init__(self, milliseconds=0, seconds=0):
-        self.period = dt.timedelta(milliseconds=milliseconds,
-                                   seconds=seconds,
-                                   minutes=0,
-                                   hours=0)
-        self.last_call = dt.datetime.min
-
-    def __call__(self, fn):
-        @wraps(fn)
-        def wrapper(*args, **kwargs):
-            now = dt.datetime.now()
-            duration = now - self.last_call
-            if duration > self.period:
-                self.last_call = now
-                return fn(*args, **kwargs)
-        return wrapper
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "chronometer"))
+import rx
 
 
 class Zoom(object):
-    def __init__(self, figure):
+    def __init__(self, figure, milliseconds=700):
         self.figure = figure
+        self.ranges = rx.Stream()
+        self.ranges.throttle(
+            milliseconds,
+            bokeh.plotting.curdoc(),
+            trailing=False).subscribe(lambda _: self.render())
         self.figure.x_range.on_change("start", self.on_change_x)
         self.figure.x_range.on_change("end", self.on_change_x)
         self.figure.y_range.on_change("start", self.on_change_y)
         self.figure.y_range.on_change("end", self.on_change_y)
 
     def on_change_x(self, attr, old, new):
-        self.render()
+        self.ranges.emit(new)
 
     def on_change_y(self, attr, old, new):
-        self.render()
+        self.ranges.emit(new)
 
-    @throttle(700)
     def render(self):
         self.draw(self.figure.x_range.start,
                   self.figure.x_range.end,
@@ -3,19 +3,15 @@ import bokeh.plotting
 import bokeh.models
 import bokeh.tile_providers
 import numpy as np
-import cartopy
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "mercator"))
+import projection
 
 
 def web_mercator(lons, lats):
-    lons, lats = np.asarray(lons), np.asarray(lats)
-    google_mercator = cartopy.crs.Mercator.GOOGLE
-    plate_carree = cartopy.crs.PlateCarree()
-    values = google_mercator.transform_points(
-            plate_carree,
-            lons,
-            lats)
-    x, y, _ = values.T
-    return x, y
+    return projection.web_mercator(lons, lats)
 
 
 from_model = True